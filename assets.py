@@ -0,0 +1,250 @@
+from __future__ import annotations
+import os
+import sys
+import json
+import struct
+import hashlib
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import pygame
+from typing import Dict
+
+IMAGE_FOLDER = 'images'
+ASSET_PACK_FILE = 'assets.pack'
+PACK_MAGIC = b'TAGMANPK'
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct('<8sII') # magic, version, manifest length
+
+LETTER_BUTTON_SIZE = 80 # two times the letter button font size
+
+# Asset name: (source file, scale rule, has alpha). Rules:
+#   ('none',)                           source size
+#   ('scale_by', factor)
+#   ('screen_width', divisor)           width becomes screen width / divisor
+#   ('height', height)
+#   ('size', (width, height))
+#   ('divide', divisor, size_file)      size of size_file divided by divisor
+#   ('match_height', asset, size_file)  size of size_file scaled to the height of an asset listed earlier
+ASSET_SPECS = {
+    'icon_image': ("favicon.png", ('size', (128, 128)), False),
+    'game_logo_no_text_scaled': (os.path.join(IMAGE_FOLDER, "game_logo_no_text.png"), ('screen_width', 1.6), True),
+    'main_menu_logo_scaled': (os.path.join(IMAGE_FOLDER, "game_logo.png"), ('scale_by', 0.5), True),
+    'game_menu_logo_scaled': (os.path.join(IMAGE_FOLDER, "logo_y_100.png"), ('height', 100), True),
+    'game_over_text_scaled': (os.path.join(IMAGE_FOLDER, "game_over_text.png"), ('scale_by', 0.7), True),
+    'you_win_text_scaled': (os.path.join(IMAGE_FOLDER, "you_win_text.png"), ('scale_by', 0.7), True),
+    'heart_full_scaled': (os.path.join(IMAGE_FOLDER, "full_heart.png"), ('size', (50, 50)), True),
+    'heart_half_scaled': (os.path.join(IMAGE_FOLDER, "half_heart.png"), ('size', (50, 50)), True),
+    'heart_empty_scaled': (os.path.join(IMAGE_FOLDER, "empty_heart.png"), ('size', (50, 50)), True),
+    'start_easy_game_unpressed_scaled': (os.path.join(IMAGE_FOLDER, "easy_button_unpressed.png"), ('divide', 5, os.path.join(IMAGE_FOLDER, "easy_button_unpressed.png")), True),
+    'start_easy_game_pressed_scaled': (os.path.join(IMAGE_FOLDER, "easy_button_pressed.png"), ('divide', 5, os.path.join(IMAGE_FOLDER, "easy_button_unpressed.png")), True),
+    'start_hard_game_unpressed_scaled': (os.path.join(IMAGE_FOLDER, "hard_button_unpressed.png"), ('divide', 5, os.path.join(IMAGE_FOLDER, "hard_button_unpressed.png")), True),
+    'start_hard_game_pressed_scaled': (os.path.join(IMAGE_FOLDER, "hard_button_pressed.png"), ('divide', 5, os.path.join(IMAGE_FOLDER, "hard_button_unpressed.png")), True),
+    'back_button_unpressed_scaled': (os.path.join(IMAGE_FOLDER, "x_back_button_unpressed.png"), ('divide', 8, os.path.join(IMAGE_FOLDER, "x_back_button_unpressed.png")), True),
+    'back_button_pressed_scaled': (os.path.join(IMAGE_FOLDER, "x_back_button_pressed.png"), ('divide', 8, os.path.join(IMAGE_FOLDER, "x_back_button_unpressed.png")), True),
+    'next_button_unpressed_scaled': (os.path.join(IMAGE_FOLDER, "next_button_unpressed.png"), ('match_height', 'start_easy_game_unpressed_scaled', os.path.join(IMAGE_FOLDER, "next_button_unpressed.png")), True),
+    'next_button_pressed_scaled': (os.path.join(IMAGE_FOLDER, "next_button_pressed.png"), ('match_height', 'start_easy_game_unpressed_scaled', os.path.join(IMAGE_FOLDER, "next_button_unpressed.png")), True),
+    'try_again_button_unpressed_scaled': (os.path.join(IMAGE_FOLDER, "try_again_button_unpressed.png"), ('match_height', 'start_easy_game_unpressed_scaled', os.path.join(IMAGE_FOLDER, "try_again_button_unpressed.png")), True),
+    'try_again_button_pressed_scaled': (os.path.join(IMAGE_FOLDER, "try_again_button_pressed.png"), ('match_height', 'start_easy_game_unpressed_scaled', os.path.join(IMAGE_FOLDER, "try_again_button_unpressed.png")), True),
+    'letter_button_unpressed_scaled': (os.path.join(IMAGE_FOLDER, "letter_button_unpressed.png"), ('size', (LETTER_BUTTON_SIZE, LETTER_BUTTON_SIZE)), True),
+    'letter_button_pressed_incorrect_scaled': (os.path.join(IMAGE_FOLDER, "letter_button_pressed_incorrect.png"), ('size', (LETTER_BUTTON_SIZE, LETTER_BUTTON_SIZE)), True),
+    'letter_button_pressed_correct_scaled': (os.path.join(IMAGE_FOLDER, "letter_button_pressed_correct.png"), ('size', (LETTER_BUTTON_SIZE, LETTER_BUTTON_SIZE)), True),
+}
+
+
+class AssetSources:
+    # Source files are read and decoded at most once per load
+    def __init__(self) -> None:
+        self.hashes: Dict[str, str] = {}
+        self.sizes: Dict[str, tuple[int, int]] = {}
+
+    def file_hash(self, file_name):
+        if file_name not in self.hashes:
+            with open(file_name, "rb") as openfile:
+                self.hashes[file_name] = hashlib.sha1(openfile.read()).hexdigest()
+        return self.hashes[file_name]
+
+    def load(self, file_name, alpha):
+        image = pygame.image.load(file_name)
+        image = image.convert_alpha() if alpha else image.convert()
+        self.sizes[file_name] = image.get_size()
+        return image
+
+    def size(self, file_name):
+        if file_name not in self.sizes:
+            self.sizes[file_name] = pygame.image.load(file_name).get_size()
+        return self.sizes[file_name]
+
+
+def scale_asset(image: pygame.Surface, rule, screen_size, sources: AssetSources, loaded: Dict[str, pygame.Surface]):
+    kind = rule[0]
+    if kind == 'none':
+        return image
+    if kind == 'scale_by':
+        return pygame.transform.smoothscale_by(image, rule[1])
+    if kind == 'screen_width':
+        return pygame.transform.smoothscale_by(image, (screen_size[0] / rule[1]) / image.get_size()[0])
+    if kind == 'height':
+        return pygame.transform.smoothscale_by(image, 1 / (image.get_size()[1] / rule[1]))
+    if kind == 'size':
+        return pygame.transform.smoothscale(image, rule[1])
+    if kind == 'divide':
+        size_x, size_y = sources.size(rule[2])
+        return pygame.transform.smoothscale(image, (int(size_x / rule[1]), int(size_y / rule[1])))
+    if kind == 'match_height':
+        size_x, size_y = sources.size(rule[2])
+        scale = 1 / (loaded[rule[1]].get_size()[1] / size_y)
+        return pygame.transform.smoothscale(image, (int(size_x / scale), int(size_y / scale)))
+    raise ValueError(f"Unknown asset scale rule {rule}")
+
+
+def asset_key(name, screen_size, sources: AssetSources):
+    # Changes whenever the source, anything the size depends on, or the rule changes
+    file_name, rule, alpha = ASSET_SPECS[name]
+    dependencies = [sources.file_hash(file_name)]
+    if rule[0] in ('divide', 'match_height'):
+        dependencies.append(sources.file_hash(rule[2]))
+    if rule[0] == 'match_height':
+        dependencies.append(asset_key(rule[1], screen_size, sources))
+    key_source = json.dumps([name, rule, alpha, list(screen_size), dependencies])
+    return hashlib.sha1(key_source.encode()).hexdigest()
+
+
+def load_asset(name, screen_size, sources: AssetSources, loaded: Dict[str, pygame.Surface]):
+    file_name, rule, alpha = ASSET_SPECS[name]
+    return scale_asset(sources.load(file_name, alpha), rule, screen_size, sources, loaded)
+
+
+def read_asset_pack(pack_file):
+    # Returns (manifest, pixel data) or None if there is no usable pack
+    try:
+        with open(pack_file, "rb") as openfile:
+            data = openfile.read()
+        magic, version, manifest_length = PACK_HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        return None
+    manifest_end = PACK_HEADER.size + manifest_length
+    manifest = json.loads(data[PACK_HEADER.size:manifest_end])
+    return manifest, memoryview(data)[manifest_end:]
+
+
+def load_packed_asset(name, screen_size, sources: AssetSources, loaded, pack_assets, pixel_data):
+    # From the pack when its entry matches the current sources and rules, stale entries are loaded from source
+    file_name, rule, alpha = ASSET_SPECS[name]
+    entry = pack_assets.get(name)
+    if entry is not None and entry['key'] == asset_key(name, screen_size, sources):
+        pixels = pixel_data[entry['offset']:entry['offset'] + entry['length']]
+        image = pygame.image.frombuffer(pixels, tuple(entry['size']), entry['format'])
+        return image.convert_alpha() if alpha else image.convert()
+    return load_asset(name, screen_size, sources, loaded)
+
+
+def read_pack_assets(screen_size, pack_file):
+    # Returns (pack entries, pixel data), no entries when there is no pack for this screen size
+    pack = read_asset_pack(pack_file) if pack_file else None
+    if pack is not None and pack[0].get('screen_size') == list(screen_size):
+        return pack[0]['assets'], pack[1]
+    return {}, None
+
+
+def load_assets(screen_size, pack_file = ASSET_PACK_FILE):
+    sources = AssetSources()
+    loaded: Dict[str, pygame.Surface] = {}
+    pack_assets, pixel_data = read_pack_assets(screen_size, pack_file)
+    for name in ASSET_SPECS:
+        loaded[name] = load_packed_asset(name, screen_size, sources, loaded, pack_assets, pixel_data)
+    return loaded
+
+
+class AssetLoader:
+    # Loads assets in a thread pool, in the given priority order. Every asset has a future,
+    # loader[name] waits for that asset only, so the first menu can be shown while the rest still load.
+    # Without threads (pygbag) every asset is loaded while it is submitted.
+    def __init__(self, screen_size, priority = (), pack_file = ASSET_PACK_FILE, max_workers = None) -> None:
+        self.screen_size = screen_size
+        self.sources = AssetSources()
+        self.pack_assets, self.pixel_data = read_pack_assets(screen_size, pack_file)
+        self.futures: Dict[str, Future] = {}
+        if max_workers is None:
+            max_workers = 0 if sys.platform == 'emscripten' else min(4, os.cpu_count() or 1)
+        executor = ThreadPoolExecutor(max_workers, thread_name_prefix='asset_loader') if max_workers > 0 else None
+        for name in list(priority) + [name for name in ASSET_SPECS if name not in priority]:
+            self._submit(name, executor)
+        if executor is not None:
+            executor.shutdown(wait=False) # queued assets still load, workers exit when done
+
+    def _submit(self, name, executor: ThreadPoolExecutor):
+        if name in self.futures:
+            return
+        rule = ASSET_SPECS[name][1]
+        if rule[0] == 'match_height': # the asset it waits for is queued ahead of it
+            self._submit(rule[1], executor)
+        if executor is not None:
+            self.futures[name] = executor.submit(self._load, name)
+            return
+        future = Future()
+        try:
+            future.set_result(self._load(name))
+        except Exception as error:
+            future.set_exception(error)
+        self.futures[name] = future
+
+    def _load(self, name):
+        return load_packed_asset(name, self.screen_size, self.sources, self, self.pack_assets, self.pixel_data)
+
+    def __getitem__(self, name) -> pygame.Surface: # waits until the asset is loaded
+        return self.futures[name].result()
+
+    def ready(self, names):
+        return all(self.futures[name].done() for name in names)
+
+    def wait(self, names):
+        for name in names:
+            self.futures[name].result()
+
+
+def build_asset_pack(screen_size, pack_file = ASSET_PACK_FILE):
+    sources = AssetSources()
+    loaded = load_assets(screen_size, pack_file=None)
+    manifest = {'screen_size': list(screen_size), 'assets': {}}
+    pixel_chunks = []
+    offset = 0
+    for name, (file_name, rule, alpha) in ASSET_SPECS.items():
+        image_format = 'RGBA' if alpha else 'RGB'
+        pixels = pygame.image.tobytes(loaded[name], image_format)
+        manifest['assets'][name] = {
+            'key': asset_key(name, screen_size, sources),
+            'source': file_name,
+            'source_hash': sources.file_hash(file_name),
+            'rule': rule,
+            'size': list(loaded[name].get_size()),
+            'format': image_format,
+            'offset': offset,
+            'length': len(pixels),
+        }
+        pixel_chunks.append(pixels)
+        offset += len(pixels)
+
+    manifest_bytes = json.dumps(manifest).encode()
+    with open(pack_file, "wb") as openfile:
+        openfile.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(manifest_bytes)))
+        openfile.write(manifest_bytes)
+        for pixels in pixel_chunks:
+            openfile.write(pixels)
+    return manifest
+
+
+if __name__ == "__main__":
+    # python assets.py build [pack file]
+    if len(sys.argv) < 2 or sys.argv[1] != 'build':
+        print("usage: python assets.py build [pack file]")
+        sys.exit(1)
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen_size = (1024, 768)
+    pygame.display.set_mode(screen_size)
+    pack_file = sys.argv[2] if len(sys.argv) > 2 else ASSET_PACK_FILE
+    start = time.perf_counter()
+    manifest = build_asset_pack(screen_size, pack_file)
+    print(f"Wrote {len(manifest['assets'])} assets to {pack_file} ({os.path.getsize(pack_file) // 1024} KB) in {time.perf_counter() - start:.2f} s")
@@ -0,0 +1,396 @@
+from __future__ import annotations
+import os
+import sys
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import argparse
+import asyncio
+import json
+import math
+import random
+import string
+import time
+from itertools import cycle
+import pygame
+from effects import Explosion, VectorExplosion, Fireworks
+from wordstore import WordList, WordStore, WORD_STORE_EXTENSION
+from timing import game_clock
+
+SCREEN_SIZE = (1024, 768)
+
+
+def time_frames(frames, *steps):
+    timings = [0.0] * len(steps)
+    for _ in range(frames):
+        for index, step in enumerate(steps):
+            start = time.perf_counter()
+            step()
+            timings[index] += time.perf_counter() - start
+    return [timing / frames * 1000 for timing in timings] # milliseconds per frame
+
+
+def benchmark_particles(screen: pygame.Surface, particle_counts, frames):
+    results = []
+    center = (SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2)
+    for explosion_class in (Explosion, VectorExplosion):
+        for particle_count in particle_counts:
+            explosion = explosion_class(screen, lifetime=10 ** 9) # particles never expire during the run
+            explosion.particle_list = [] # don't share the prerendered class level particles between runs
+            explosion.init_particles()
+            if explosion_class is Explosion: # one prerendered particle per live particle, like the default pool
+                while len(explosion.particle_list) < particle_count:
+                    angle = math.radians(random.randrange(360))
+                    explosion.particle_list.append(explosion.create_particle((math.cos(angle), math.sin(angle))))
+                explosion.particle_cycle = cycle(explosion.particle_list)
+
+            bursts = max(particle_count // explosion.particle_amount, 1)
+            start = time.perf_counter()
+            for _ in range(bursts):
+                explosion.new_explosion(center, (178, 134, 54))
+            spawn_time = (time.perf_counter() - start) * 1000 / bursts
+            tint_cache_stats = explosion.tint_cache.stats() # a miss is a surface allocated for a burst
+
+            update_time, draw_time = time_frames(frames, explosion.update, lambda: explosion.draw(screen))
+            results.append({
+                'backend': explosion_class.__name__,
+                'particles': particle_count,
+                'spawn_ms_per_burst': round(spawn_time, 4),
+                'update_ms': round(update_time, 4),
+                'draw_ms': round(draw_time, 4),
+                'tint_cache_hits': tint_cache_stats['hits'],
+                'tint_cache_misses': tint_cache_stats['misses'],
+            })
+    return results
+
+
+def benchmark_flash(screen: pygame.Surface, flash_counts, frames):
+    results = []
+    colors = [(220, 60, 30), (40, 200, 90), (120, 40, 230)]
+    for flash_count in flash_counts:
+        fireworks = Fireworks(screen)
+
+        def frame():
+            # keep flash_count overlapping flashes alive, like bursts from separate rockets (no particles)
+            ticks = game_clock.render_time()
+            while len(fireworks.flash_list) < flash_count:
+                index = len(fireworks.flash_list)
+                fireworks.flash_list.append({'color': colors[index % len(colors)], 'start_tick': ticks - index * 50})
+            fireworks.draw(screen)
+
+        draw_time, = time_frames(frames, frame)
+        results.append({'flashes': flash_count, 'draw_ms': round(draw_time, 4)})
+    return results
+
+
+def synthetic_words(word_count, seed = 1):
+    # lowercase words of 4 to 12 letters, letters drawn with english frequencies
+    from simulate import ENGLISH_LETTER_WEIGHTS
+    rng = random.Random(seed)
+    letters = [letter.lower() for letter in ENGLISH_LETTER_WEIGHTS]
+    weights = list(ENGLISH_LETTER_WEIGHTS.values())
+    return [''.join(rng.choices(letters, weights, k=rng.randint(4, 12))) for _ in range(word_count)]
+
+
+def benchmark_hints(words, games, seed = 1):
+    # Plays games against the dictionary and asks for a hint before every guess, like a player pressing the hint key each turn
+    from hints import HintEngine, HINT_LATENCY_BUDGET
+    from rules import RoundState, MAX_HEALTH
+    start = time.perf_counter()
+    engine = HintEngine(words)
+    load_time = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    query_times = []
+    for _ in range(games):
+        round_state = RoundState(words[rng.randrange(len(words))], MAX_HEALTH)
+        while not round_state.is_over():
+            letter = engine.best_letter(round_state.revealed_text(), round_state.guessed_mask)
+            query_times.append(engine.last_query_time * 1000)
+            if letter is None or rng.random() < 0.3: # players don't always follow the hint
+                letter = rng.choice([letter for letter in string.ascii_uppercase if not round_state.is_guessed(letter)])
+            round_state.guess(letter)
+    summary = frame_time_summary(query_times)
+    return {
+        'words': len(words),
+        'load_s': round(load_time, 3),
+        'queries': summary.pop('frames'),
+        **summary,
+        'max_scored_candidates': engine.max_scored_candidates,
+        'budget_ms': HINT_LATENCY_BUDGET * 1000,
+        'p99_within_budget': summary['p99_ms'] <= HINT_LATENCY_BUDGET * 1000,
+    }
+
+
+async def play_server_client(address, games, mode, rng: random.Random, guess_times):
+    # One connection playing games with weighted letter orders, every guess is timed from send to reply
+    from simulate import weighted_order
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+    try:
+        for _ in range(games):
+            writer.write(json.dumps({'cmd': 'new', 'mode': mode}).encode() + b'\n')
+            reply = json.loads(await reader.readline())
+            for letter in weighted_order(rng):
+                if reply['outcome'] != -1:
+                    break
+                if letter in reply['guessed']:
+                    continue
+                start = time.perf_counter()
+                writer.write(json.dumps({'cmd': 'guess', 'letter': letter}).encode() + b'\n')
+                reply = json.loads(await reader.readline())
+                guess_times.append((time.perf_counter() - start) * 1000)
+    finally:
+        writer.close()
+
+
+async def benchmark_server(clients, games, mode, address = None, wordlist = "wordlist.txt", seed = 1):
+    # Opens every client connection at once against a running server, or one started in this event loop
+    server_task = None
+    if address is None:
+        from server import GameServer
+        from wordstore import open_wordlist
+        ready = asyncio.get_running_loop().create_future()
+        server_task = asyncio.create_task(GameServer(open_wordlist(wordlist), seed).serve(port=0, ready=ready))
+        address = await ready
+    guess_times = []
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(play_server_client(address, games, mode, random.Random(f"{seed}/{client}"), guess_times) for client in range(clients)))
+    finally:
+        if server_task is not None:
+            server_task.cancel()
+    elapsed = time.perf_counter() - start
+    summary = frame_time_summary(guess_times)
+    return {
+        'clients': clients,
+        'games': clients * games,
+        'guesses': summary.pop('frames'),
+        'guesses_per_s': round(len(guess_times) / elapsed),
+        **summary,
+    }
+
+
+def percentile(sorted_values, fraction): # nearest rank
+    index = min(int(math.ceil(fraction * len(sorted_values))) - 1, len(sorted_values) - 1)
+    return sorted_values[max(index, 0)]
+
+
+def frame_time_summary(frame_times):
+    frame_times = sorted(frame_times)
+    return {
+        'frames': len(frame_times),
+        'mean_ms': round(sum(frame_times) / len(frame_times), 4),
+        'p50_ms': round(percentile(frame_times, 0.50), 4),
+        'p95_ms': round(percentile(frame_times, 0.95), 4),
+        'p99_ms': round(percentile(frame_times, 0.99), 4),
+        'max_ms': round(frame_times[-1], 4),
+    }
+
+
+def key_event(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, scancode=0, unicode=chr(key) if key < 0x110000 else '')
+
+
+def click_event(position):
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=position)
+
+
+# Scripted sessions are generators that yield the input events of the next frame.
+# Frames are timed only after a session yields START_MEASURING, so setup steps like reaching the score menu don't count.
+START_MEASURING = None
+
+
+def wait_until_ready(tagman, menu = None):
+    game = tagman.game
+    while game.input_frozen or game.menu_transitioning_state != tagman.NO_TRANSITION or (menu is not None and game.current_menu != menu):
+        yield []
+
+
+def wait_frames(frames):
+    for _ in range(frames):
+        yield []
+
+
+def wait_time(milliseconds): # game time, runs at real time speed
+    end_tick = game_clock.now() + milliseconds
+    while game_clock.now() < end_tick:
+        yield []
+
+
+def guess_letters(tagman, letters):
+    for letter in letters:
+        yield from wait_until_ready(tagman, tagman.PLAY_MENU)
+        yield [key_event(ord(letter.lower()))]
+        yield from wait_frames(5)
+
+
+def start_menu_session(tagman):
+    yield START_MEASURING
+    while True:
+        yield []
+
+
+def menu_transition_session(tagman):
+    yield START_MEASURING
+    while True:
+        yield from wait_until_ready(tagman, tagman.START_MENU)
+        yield [click_event(tagman.start_easy_button.rect.center)]
+        yield from wait_until_ready(tagman, tagman.PLAY_MENU)
+        yield [key_event(pygame.K_ESCAPE)]
+
+
+def correct_guess_session(tagman):
+    yield START_MEASURING
+    yield [key_event(pygame.K_RETURN)] # start an easy game
+    while True:
+        yield from wait_until_ready(tagman, tagman.PLAY_MENU)
+        round_state = tagman.game.round
+        yield from guess_letters(tagman, [letter for letter in round_state.letter_positions if not round_state.is_guessed(letter)])
+        yield from wait_until_ready(tagman, tagman.SCORE_MENU)
+        yield [key_event(pygame.K_RETURN)] # next word
+
+
+def wrong_guess_session(tagman):
+    yield START_MEASURING
+    yield [key_event(pygame.K_RETURN)]
+    while True:
+        yield from wait_until_ready(tagman, tagman.PLAY_MENU)
+        answer = tagman.game.answer_object
+        yield from guess_letters(tagman, [letter for letter in reversed(tagman.string.ascii_uppercase) if letter not in answer.text][:tagman.game.heart_object.get_health()])
+        yield from wait_until_ready(tagman, tagman.SCORE_MENU)
+        yield [key_event(pygame.K_RETURN)] # try again
+
+
+def win_screen_session(tagman):
+    yield [key_event(pygame.K_RETURN)]
+    yield from wait_until_ready(tagman, tagman.PLAY_MENU)
+    round_state = tagman.game.round
+    yield from guess_letters(tagman, [letter for letter in round_state.letter_positions if not round_state.is_guessed(letter)])
+    yield from wait_until_ready(tagman, tagman.SCORE_MENU)
+    yield from wait_time(1500) # first rockets explode
+    yield START_MEASURING
+    while True: # fireworks keep going on the score menu
+        yield []
+
+
+GAME_SCENARIOS = {
+    'start_menu': start_menu_session,
+    'menu_transitions': menu_transition_session,
+    'correct_guesses': correct_guess_session,
+    'wrong_guesses': wrong_guess_session,
+    'win_screen': win_screen_session,
+}
+
+
+def reset_game(tagman):
+    game = tagman.game
+    tagman.score_menu_effects.deactivate_effects()
+    game.set_current_menu(tagman.START_MENU)
+    game.menu_transitioning_state = tagman.NO_TRANSITION
+    game.game_ended = tagman.NOT_ENDED
+    game.difficulty_mode = None
+    game.unfreeze_input()
+
+
+def benchmark_game(tagman, frames, scenarios = None, profiler = None):
+    # tagman is the initialized main module, frames run back to back without the frame cap
+    renderer = tagman.DirtyRectRenderer(tagman.game, tagman.BACKGROUND_COLOR) if tagman.DIRTY_RECT_RENDERING else None
+    results = {}
+    for scenario in scenarios or GAME_SCENARIOS:
+        reset_game(tagman)
+        if renderer is not None:
+            renderer.invalidate()
+        session = GAME_SCENARIOS[scenario](tagman)
+        frame_times = []
+        measuring = False
+        measure_start = game_start = None
+        while len(frame_times) < frames:
+            events = next(session)
+            if events is START_MEASURING:
+                measuring = True
+                measure_start = time.perf_counter()
+                game_start = game_clock.now()
+                continue
+            if profiler is not None:
+                profiler.begin_frame(tagman.game.current_menu, tagman.game.menu_transitioning_state)
+            start = time.perf_counter()
+            tagman.handle_events(events)
+            if profiler is not None:
+                profiler.mark(tagman.EVENTS_PHASE)
+            tagman.run_frame(renderer, profiler)
+            if profiler is not None:
+                profiler.end_frame()
+            if measuring:
+                frame_times.append((time.perf_counter() - start) * 1000)
+        wall_time = time.perf_counter() - measure_start
+        results[scenario] = frame_time_summary(frame_times)
+        # Raw throughput: frames drawn per second, and game time advanced per real time, 1.0 when the
+        # fixed steps keep up. Above 1 frames per step the extra frames only interpolate.
+        results[scenario]['fps'] = round(len(frame_times) / wall_time, 1)
+        results[scenario]['game_speed'] = round((game_clock.now() - game_start) / (wall_time * 1000), 3)
+    return {
+        'pygame': pygame.version.ver,
+        'dirty_rects': renderer is not None,
+        'scenarios': results,
+    }
+
+
+def write_results(results, output = None):
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as openfile:
+            openfile.write(text + "\n")
+    else:
+        print(text)
+
+
+def print_table(results):
+    columns = list(results[0].keys())
+    print(' '.join(f"{column:>20}" for column in columns))
+    for result in results:
+        print(' '.join(f"{result[column]:>20}" for column in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TagMan micro benchmarks")
+    parser.add_argument('scenario', choices=['particles', 'flash', 'hints', 'server'])
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--words', type=int, default=1000000, help="size of the generated dictionary for hints")
+    parser.add_argument('--wordlist', help="benchmark hints on this wordlist or .words store instead")
+    parser.add_argument('--games', type=int, help="games played for hints (default 200), or per client for server (default 5)")
+    parser.add_argument('--clients', type=int, default=1000, help="concurrent connections for server")
+    parser.add_argument('--mode', choices=['easy', 'hard'], default='hard', help="difficulty the server clients play")
+    parser.add_argument('--connect', help="HOST:PORT or unix socket path of a running server.py, default starts one in process")
+    parser.add_argument('--json', action='store_true', help="print results as json instead of a table")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+
+    if args.scenario == 'particles':
+        results = benchmark_particles(screen, (30, 300, 3000), args.frames)
+    elif args.scenario == 'flash':
+        results = benchmark_flash(screen, (1, 2, 3), args.frames)
+    elif args.scenario == 'hints':
+        if args.wordlist and args.wordlist.endswith(WORD_STORE_EXTENSION):
+            words = WordStore(args.wordlist)
+        elif args.wordlist:
+            words = WordList([line.rstrip() for line in open(args.wordlist) if line.strip()])
+        else:
+            words = WordList(synthetic_words(args.words))
+        results = [benchmark_hints(words, args.games or 200)]
+    elif args.scenario == 'server':
+        address = args.connect
+        if address is not None and ':' in address:
+            host, port = address.rsplit(':', 1)
+            address = (host, int(port))
+        results = [asyncio.run(benchmark_server(args.clients, args.games or 5, args.mode, address, args.wordlist or "wordlist.txt"))]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    if args.scenario == 'hints' and not all(result['p99_within_budget'] for result in results):
+        sys.exit("hint p99 latency is over budget")
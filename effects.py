@@ -5,10 +5,17 @@ import random
 from typing import List, Dict
 import math
 from itertools import cycle
-import time
+from collections import OrderedDict
+from timing import game_clock
+try:
+    import numpy as np
+except ImportError: # pure python particles are used without numpy
+    np = None
 
 random.seed()
 
+PHYSICS_FRAME_TIME = 1000 / 60 # speeds, drag and gravity are per frame at 60 fps, steps of another length scale them
+
 PARTICLE_SURFACES = 'particle_surfaces'
 PARTICLE_RECTS = 'particle_rects'
 
@@ -46,6 +53,9 @@ class EffectController:
             for effect in self.managed_effects:
                 effect.update()
 
+    def next_deadline(self): # effects animate every step while active
+        return game_clock.now() if self.effects_active else None
+
     def draw(self, screen):
         if self.effects_active:
             for effect in self.managed_effects:
@@ -91,31 +101,38 @@ class Fireworks(Effect):
         self.min_launch_delay = 750
         self.next_launch = 0
         self.last_launch = 0
+        self.random = random.Random()
         self.flash_lifetime = 200
-        self.flash_list: List[tuple[pygame.Surface, int, int]] = [] # flash surface and flash start tick
-        self.flash_update_interval = 1000 / 60
+        self.flash_list: List[Dict] = [] # flash color and flash start tick
+        self.flash_overlay = pygame.Surface(self.screen.get_size()) # reused by every flash, all active flashes are merged into one blit
+        self.flash_overlay_color = None
         self.explosion_lifetime = 1500
-        self.explosion_object: Explosion = Explosion(self.screen, self.explosion_lifetime)
+        explosion_class = VectorExplosion if np is not None else Explosion
+        self.explosion_object: Explosion = explosion_class(self.screen, self.explosion_lifetime)
         self.explosion_object.init_particles()
-        self.last_update = 0
+
+    def seed(self, fireworks_seed, explosion_seed): # repeatable launches, colors and particles
+        self.random.seed(fireworks_seed)
+        self.explosion_object.seed(explosion_seed)
+
+    def position_sum(self): # of rockets and particles, compared between runs
+        return sum(instance.rect[0] + instance.rect[1] for instance in self.instances) + self.explosion_object.position_sum()
 
     def new_instance(self):
         x_padding = 100
         screen_x, screen_y = self.screen.get_size()
-        random_x = random.randrange(x_padding, screen_x - x_padding)
-        lifetime = random.randrange(self.min_lifetime, self.max_lifetime)
-        speed = random.randrange(self.min_speed * 10, self.max_speed * 10) / 10
-        new_firework = FireworkInstance(self.screen, lifetime, (random_x, screen_y + 5), (random.choice(self.firework_colors)), speed)
+        random_x = self.random.randrange(x_padding, screen_x - x_padding)
+        lifetime = self.random.randrange(self.min_lifetime, self.max_lifetime)
+        speed = self.random.randrange(self.min_speed * 10, self.max_speed * 10) / 10
+        x_variation = self.random.randrange(-1, 1) * 0.3
+        new_firework = FireworkInstance(self.screen, lifetime, (random_x, screen_y + 5), (self.random.choice(self.firework_colors)), speed, x_variation)
         self.instances.append(new_firework)
 
     def update(self):
-        current_time = time.time()
-        delta_time = current_time - self.last_update
-        self.last_update = current_time
-        ticks = pygame.time.get_ticks()
+        ticks = game_clock.now()
         if len(self.instances) < self.max_effects and ticks - self.last_launch >= self.next_launch:
             self.new_instance()
-            self.next_launch = ticks + random.randrange(self.min_launch_delay, self.max_launch_delay)
+            self.next_launch = ticks + self.random.randrange(self.min_launch_delay, self.max_launch_delay)
         for instance in self.instances:
             instance.update()
 
@@ -132,29 +149,46 @@ class Fireworks(Effect):
         high_range = (150, 255)
         full_range = (0, 255)
         low_range = (0, 100)
-        red_range, green_range, blue_range = random.sample([high_range, full_range, low_range], 3)
-        return (random.randint(*red_range), random.randint(*green_range), random.randint(*blue_range))
+        red_range, green_range, blue_range = self.random.sample([high_range, full_range, low_range], 3)
+        return (self.random.randint(*red_range), self.random.randint(*green_range), self.random.randint(*blue_range))
 
     
     def firework_explosion(self, color, center):
-        flash_surface = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        flash_surface.fill(color)
-        self.flash_list.append({'surface': flash_surface, 'start_tick': pygame.time.get_ticks(), 'last_update': 0})
+        self.flash_list.append({'color': color, 'start_tick': game_clock.now()})
         self.explosion_object.new_explosion(center, color)
-        
+
+    def composite_flash(self, ticks):
+        # Merges the active flashes into one color and alpha, equal to blitting them one after another
+        transparency = 1.0
+        premultiplied = [0.0, 0.0, 0.0]
+        for flash in self.flash_list:
+            elapsed_time = ticks - flash['start_tick']
+            alpha = (self.flash_start_alpha - self.flash_start_alpha * (elapsed_time / self.flash_lifetime)) / 255
+            for i in range(3):
+                premultiplied[i] = premultiplied[i] * (1 - alpha) + flash['color'][i] * alpha
+            transparency *= 1 - alpha
+        alpha = 1 - transparency
+        if alpha <= 0:
+            return None, 0
+        color = tuple(min(int(channel / alpha + 0.5), 255) for channel in premultiplied)
+        return color, alpha * 255
+
     def draw(self, screen):
         for instance in self.instances:
             instance.draw(screen)
-        ticks = pygame.time.get_ticks()
+        ticks = game_clock.render_time()
         self.flash_list = [flash for flash in self.flash_list if not ticks - flash['start_tick'] >= self.flash_lifetime]
-        for flash in self.flash_list:
-            flash_surface = flash['surface']
-            elapsed_time = ticks - flash['start_tick']
-            if ticks - flash['last_update'] >= self.flash_update_interval:
-                alpha = self.flash_start_alpha - self.flash_start_alpha * (elapsed_time / self.flash_lifetime)
-                flash_surface.set_alpha(alpha)
-                self.screen.blit(flash_surface, flash_surface.get_rect())
-                flash['last_update'] = ticks
+        if self.flash_list:
+            color, alpha = self.composite_flash(ticks)
+            if color is not None:
+                if self.flash_overlay.get_size() != screen.get_size():
+                    self.flash_overlay = pygame.Surface(screen.get_size())
+                    self.flash_overlay_color = None
+                if color != self.flash_overlay_color: # a single fading flash keeps its color, only the alpha changes
+                    self.flash_overlay.fill(color)
+                    self.flash_overlay_color = color
+                self.flash_overlay.set_alpha(alpha)
+                screen.blit(self.flash_overlay, (0, 0))
 
         self.explosion_object.draw(screen)
 
@@ -165,7 +199,7 @@ class EffectInstance:
         self.lifetime = lifetime
         self.position = position
         self.color = None
-        self.start_age = pygame.time.get_ticks()
+        self.start_age = game_clock.now()
         self.surface: pygame.Surface = None
         self.rect: pygame.Rect = None
 
@@ -173,7 +207,7 @@ class EffectInstance:
         pass
 
     def is_expired(self):
-        ticks = pygame.time.get_ticks()
+        ticks = game_clock.now()
         return ticks - self.start_age >= self.lifetime
     
     def draw(self, screen):
@@ -181,6 +215,55 @@ class EffectInstance:
             screen.blit(self.surface, self.rect)
 
 
+def tint_surface(surface: pygame.Surface, color):
+    # Replaces the rgb of every pixel with color and keeps the alpha, using two bulk fills instead of per pixel access
+    red, green, blue = color[:3]
+    surface.fill((0, 0, 0, 255), special_flags=pygame.BLEND_RGBA_MULT)
+    surface.fill((red, green, blue, 0), special_flags=pygame.BLEND_RGBA_ADD)
+
+
+class ParticleTintCache:
+    # Bounded LRU of tinted particle circles, keyed by quantized color
+    def __init__(self, particle_size, max_entries = 256, color_step = 16) -> None:
+        self.particle_size = particle_size
+        self.max_entries = max_entries
+        self.color_step = color_step
+        self.surfaces: OrderedDict[tuple[int, int, int], pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        surface_size = particle_size * 2
+        self.base_surface = pygame.Surface((surface_size, surface_size), pygame.SRCALPHA)
+        pygame.draw.circle(self.base_surface, WHITE_COLOR, (particle_size, particle_size), particle_size)
+
+    def quantize(self, color):
+        step = self.color_step
+        return tuple(min(channel // step * step + step // 2, 255) for channel in color[:3])
+
+    def get(self, color) -> pygame.Surface:
+        key = self.quantize(color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.base_surface.copy()
+        tint_surface(surface, key)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.surfaces), 'max_entries': self.max_entries}
+
+
 class Explosion:
     particle_list: List[Dict] = []
     particle_cycle = cycle(particle_list)
@@ -189,7 +272,7 @@ class Explosion:
         self.screen = screen
         self.lifetime = lifetime
         self.color = None
-        self.start_age = pygame.time.get_ticks()
+        self.start_age = game_clock.now()
         self.surface: pygame.Surface = None
         self.rect: pygame.Rect = None
 
@@ -198,26 +281,27 @@ class Explosion:
         self.min_speed = 1
         self.particle_size = 6
         self.particle_update_list = []
+        self.tint_cache = ParticleTintCache(self.particle_size)
+        self.random = random.Random()
 
-    def set_particle_color(self, surface: pygame.Surface, color):
-        width, height = surface.get_size()
-        red, green, blue = color
-        for x in range(width):
-            for y in range(height):
-                alpha = surface.get_at((x, y ))[3]
-                surface.set_at((x, y), pygame.Color(red, green, blue, alpha))
+    def seed(self, seed): # the prerendered particles are shared, their directions are drawn again from the seed
+        self.random.seed(seed)
+        self.particle_list.clear()
+        self.particle_update_list = []
+        self.init_particles()
 
     def new_explosion(self, position, color):
+        particle_surface = self.tint_cache.get(color)
         for _ in range(self.particle_amount):
             new_particle = next(self.particle_cycle)
-            new_particle['surface'].set_alpha(255)
-            self.set_particle_color(new_particle['surface'], color)
-            speed = random.randrange(self.min_speed * 10, self.max_speed * 10) / 10
+            new_particle['surface'] = particle_surface
+            speed = self.random.randrange(self.min_speed * 10, self.max_speed * 10) / 10
             new_particle['position']['x'], new_particle['position']['y'] = position
+            new_particle['previous_position']['x'], new_particle['previous_position']['y'] = position
             new_particle['velocity']['x'] = speed * new_particle['direction']['x']
             new_particle['velocity']['y'] = speed * new_particle['direction']['y']
             new_particle['lifetime'] = self.lifetime
-            new_particle['start_tick'] = pygame.time.get_ticks()
+            new_particle['start_tick'] = game_clock.now()
             new_particle['color'] = color
             self.particle_update_list.append(new_particle)
         
@@ -226,7 +310,7 @@ class Explosion:
             particles_to_prerender = self.particle_amount * 5
             angle_increment = 360 / self.particle_amount
             for i in range(particles_to_prerender):
-                random_angle_shift = random.randrange(0, angle_increment // 2)
+                random_angle_shift = self.random.randrange(0, angle_increment // 2)
                 angle = (i * angle_increment + random_angle_shift) % 360
                 angle_radians = math.radians(angle)
                 direction = (math.cos(angle_radians), math.sin(angle_radians))
@@ -235,39 +319,158 @@ class Explosion:
 
             self.particle_cycle = cycle(self.particle_list)
         
-    def create_particle(self, direction):
-        color = (0, 0, 0)
+    def create_particle(self, direction): # no surface of its own, a burst hands it the cached tint surface
         position = (-50, -50)
-        surface_size = self.particle_size * 2
-        firework_surface = pygame.Surface((surface_size, surface_size), pygame.SRCALPHA)
-        pygame.draw.circle(firework_surface, color, (self.particle_size, self.particle_size), self.particle_size)
-        return {"surface": firework_surface, "direction": {'x': direction[0], 'y': direction[1]}, "velocity": {'x': 0, 'y': 0}, "position": {'x': position[0], 'y': position[1], "lifetime": 0, "color": (0, 0, 0)}}
+        return {"surface": None, "direction": {'x': direction[0], 'y': direction[1]}, "velocity": {'x': 0, 'y': 0}, "position": {'x': position[0], 'y': position[1], "lifetime": 0, "color": (0, 0, 0)}, "previous_position": {'x': position[0], 'y': position[1]}}
 
-    def update(self):
-        air_drag = 0.98
-        gravity = 0.1
-        ticks = pygame.time.get_ticks()
+    def update(self): # one clock step
+        step_fraction = game_clock.step_time / PHYSICS_FRAME_TIME
+        air_drag = 0.98 ** step_fraction
+        gravity = 0.1 * step_fraction
+        ticks = game_clock.now()
         for particle in self.particle_update_list:
             elapsed_time = (ticks - particle["start_tick"])
+            particle["previous_position"]['x'] = particle["position"]['x']
+            particle["previous_position"]['y'] = particle["position"]['y']
             particle["velocity"]['y'] += gravity * (elapsed_time / 1000)**2
             particle["velocity"]['x'] *= air_drag
             particle["velocity"]['y'] *= air_drag
-            particle["position"]['x'] += particle["velocity"]['x']
-            particle["position"]['y'] += particle["velocity"]['y']
+            particle["position"]['x'] += particle["velocity"]['x'] * step_fraction
+            particle["position"]['y'] += particle["velocity"]['y'] * step_fraction
             if elapsed_time >= particle["lifetime"]:
                 self.particle_update_list.remove(particle)
 
-    def draw(self, screen: pygame.Surface):
+    def position_sum(self):
+        return sum(particle["position"]['x'] + particle["position"]['y'] for particle in self.particle_update_list)
+
+    def draw(self, screen: pygame.Surface): # between the previous and the last step
+        alpha = game_clock.alpha
         for particle in self.particle_update_list:
-            screen.blit(particle['surface'], (int(particle["position"]['x']), int(particle["position"]['y'])))
+            previous_position, position = particle["previous_position"], particle["position"]
+            x = previous_position['x'] + (position['x'] - previous_position['x']) * alpha
+            y = previous_position['y'] + (position['y'] - previous_position['y']) * alpha
+            screen.blit(particle['surface'], (int(x), int(y)))
             
 
+class VectorExplosion:
+    # Same interface as Explosion, but particles are kept as numpy arrays (structure of arrays)
+    # and the whole set is integrated in one step per clock step.
+    def __init__(self, screen, lifetime) -> None:
+        self.screen = screen
+        self.lifetime = lifetime
+        self.color = None
+        self.start_age = game_clock.now()
+        self.surface: pygame.Surface = None
+        self.rect: pygame.Rect = None
+
+        self.particle_amount = 30
+        self.max_speed = 15
+        self.min_speed = 1
+        self.particle_size = 6
+        self.air_drag = 0.98
+        self.gravity = 0.1
+        self.rng = np.random.default_rng()
+        self.tint_cache = ParticleTintCache(self.particle_size)
+
+        self.capacity = 0
+        self.particle_count = 0
+        self.positions = None
+        self.previous_positions = None
+        self.velocities = None
+        self.start_ticks = None
+        self.lifetimes = None
+        self.surfaces = None
+
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self.particle_count = 0
+
+    def init_particles(self):
+        if self.capacity == 0:
+            self._resize(self.particle_amount * 5)
+
+    def _resize(self, capacity):
+        count = self.particle_count
+        positions = np.zeros((capacity, 2), dtype=np.float64)
+        previous_positions = np.zeros((capacity, 2), dtype=np.float64)
+        velocities = np.zeros((capacity, 2), dtype=np.float64)
+        start_ticks = np.zeros(capacity, dtype=np.float64)
+        lifetimes = np.zeros(capacity, dtype=np.int64)
+        surfaces = np.empty(capacity, dtype=object)
+        if count:
+            positions[:count] = self.positions[:count]
+            previous_positions[:count] = self.previous_positions[:count]
+            velocities[:count] = self.velocities[:count]
+            start_ticks[:count] = self.start_ticks[:count]
+            lifetimes[:count] = self.lifetimes[:count]
+            surfaces[:count] = self.surfaces[:count]
+        self.positions, self.previous_positions, self.velocities = positions, previous_positions, velocities
+        self.start_ticks, self.lifetimes = start_ticks, lifetimes
+        self.surfaces = surfaces
+        self.capacity = capacity
+
+    def new_explosion(self, position, color):
+        amount = self.particle_amount
+        if self.particle_count + amount > self.capacity:
+            self._resize(max(self.capacity * 2, self.particle_count + amount))
+        start, end = self.particle_count, self.particle_count + amount
+
+        angle_increment = 360 / amount
+        angle_shifts = self.rng.integers(0, max(int(angle_increment // 2), 1), amount)
+        angles = np.radians((np.arange(amount) * angle_increment + angle_shifts) % 360)
+        speeds = self.rng.integers(self.min_speed * 10, self.max_speed * 10, amount) / 10
+
+        self.positions[start:end] = position[0], position[1]
+        self.previous_positions[start:end] = position[0], position[1]
+        self.velocities[start:end, 0] = np.cos(angles) * speeds
+        self.velocities[start:end, 1] = np.sin(angles) * speeds
+        self.start_ticks[start:end] = game_clock.now()
+        self.lifetimes[start:end] = self.lifetime
+        self.surfaces[start:end] = self.tint_cache.get(color) # one cached surface shared by the whole burst
+        self.particle_count = end
+
+    def update(self): # one clock step
+        count = self.particle_count
+        if not count:
+            return
+        step_fraction = game_clock.step_time / PHYSICS_FRAME_TIME
+        elapsed_time = game_clock.now() - self.start_ticks[:count]
+        velocities = self.velocities[:count]
+        velocities[:, 1] += self.gravity * step_fraction * (elapsed_time / 1000)**2
+        velocities *= self.air_drag ** step_fraction
+        self.previous_positions[:count] = self.positions[:count]
+        self.positions[:count] += velocities * step_fraction
+
+        alive = elapsed_time < self.lifetimes[:count]
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count != count: # retire expired particles by compacting the live ones to the front
+            self.positions[:alive_count] = self.positions[:count][alive]
+            self.previous_positions[:alive_count] = self.previous_positions[:count][alive]
+            self.velocities[:alive_count] = velocities[alive]
+            self.start_ticks[:alive_count] = self.start_ticks[:count][alive]
+            self.lifetimes[:alive_count] = self.lifetimes[:count][alive]
+            self.surfaces[:alive_count] = self.surfaces[:count][alive]
+            self.surfaces[alive_count:count] = None
+            self.particle_count = alive_count
+
+    def position_sum(self):
+        return float(self.positions[:self.particle_count].sum()) if self.particle_count else 0.0
+
+    def draw(self, screen: pygame.Surface):
+        count = self.particle_count
+        if not count:
+            return
+        previous_positions = self.previous_positions[:count]
+        positions = (previous_positions + (self.positions[:count] - previous_positions) * game_clock.alpha).astype(np.int64).tolist()
+        screen.blits(zip(self.surfaces[:count].tolist(), positions), doreturn=False)
+
+
 class FireworkInstance(EffectInstance):
-    def __init__(self, screen, lifetime, position, color, speed) -> None:
+    def __init__(self, screen, lifetime, position, color, speed, x_variation = 0) -> None:
         super().__init__(screen, lifetime, position)
         self.speed = speed
         self.color = color
-        self.x_variation = random.randrange(-1, 1) * 0.3
+        self.x_variation = x_variation
         surface_size = 9
         firework_size = surface_size // 2
         firework_surface = pygame.Surface((surface_size, surface_size), pygame.SRCALPHA)
@@ -276,9 +479,16 @@ class FireworkInstance(EffectInstance):
         firework_rect.center = position
         self.surface = firework_surface
         self.rect = firework_rect
+        self.previous_rect = firework_rect
 
-    def update(self):
-        self.rect = self.rect[0] + self.x_variation, self.rect[1] - self.speed
+    def update(self): # one clock step
+        step_fraction = game_clock.step_time / PHYSICS_FRAME_TIME
+        self.previous_rect = self.rect
+        self.rect = self.rect[0] + self.x_variation * step_fraction, self.rect[1] - self.speed * step_fraction
+
+    def draw(self, screen):
+        alpha = game_clock.alpha
+        screen.blit(self.surface, (self.previous_rect[0] + (self.rect[0] - self.previous_rect[0]) * alpha, self.previous_rect[1] + (self.rect[1] - self.previous_rect[1]) * alpha))
 
 
 if __name__ == "__main__":
@@ -313,7 +523,9 @@ if __name__ == "__main__":
     
         screen.fill((100, 100, 100))
 
-        score_menu_effects.update()
+        for _ in range(game_clock.advance()):
+            game_clock.step()
+            score_menu_effects.update()
         score_menu_effects.draw(screen)
 
         pygame.display.flip()
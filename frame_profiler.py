@@ -0,0 +1,98 @@
+from __future__ import annotations
+import csv
+import json
+import time
+from array import array
+from typing import Dict, List
+
+EVENTS_PHASE = 0
+EFFECTS_UPDATE_PHASE = 1
+EFFECTS_DRAW_PHASE = 2
+GAME_UPDATE_PHASE = 3
+GAME_DRAW_PHASE = 4
+DISPLAY_PHASE = 5
+TICK_PHASE = 6
+MENU_BUILD_PHASE = 7 # building menus whose images finished loading
+
+PHASE_NAMES = ['events', 'effects_update', 'effects_draw', 'game_update', 'game_draw', 'display', 'tick', 'menu_build']
+
+
+class FrameProfiler:
+    # Records the time of every phase of the last `capacity` frames in a preallocated ring buffer.
+    # Each frame is labelled with its menu and transition state so the dump can be rolled up per menu.
+    def __init__(self, capacity = 60 * 60 * 10, transition_names: Dict[int, str] = None) -> None:
+        self.capacity = capacity
+        self.phase_count = len(PHASE_NAMES)
+        self.samples = array('d', bytes(8 * capacity * self.phase_count)) # seconds, frame major
+        self.frame_menus: List[str] = [None] * capacity
+        self.frame_transitions = array('b', bytes(capacity))
+        self.transition_names = transition_names or {}
+        self.frame_count = 0 # total frames recorded, the ring holds the last `capacity` of them
+        self.frame_offset = 0
+        self.last_time = 0.0
+
+    def begin_frame(self, menu, transition_state):
+        slot = self.frame_count % self.capacity
+        self.frame_offset = slot * self.phase_count
+        for phase in range(self.phase_count):
+            self.samples[self.frame_offset + phase] = 0.0
+        self.frame_menus[slot] = menu
+        self.frame_transitions[slot] = transition_state
+        self.last_time = time.perf_counter()
+
+    def mark(self, phase): # time since the previous mark is added to phase
+        now = time.perf_counter()
+        self.samples[self.frame_offset + phase] += now - self.last_time
+        self.last_time = now
+
+    def end_frame(self):
+        self.frame_count += 1
+
+    def recorded_slots(self): # ring slots in recording order
+        recorded = min(self.frame_count, self.capacity)
+        first_slot = (self.frame_count - recorded) % self.capacity
+        return [(first_slot + index) % self.capacity for index in range(recorded)]
+
+    def frame_rows(self):
+        first_frame = self.frame_count - min(self.frame_count, self.capacity)
+        for index, slot in enumerate(self.recorded_slots()):
+            offset = slot * self.phase_count
+            phase_times = [self.samples[offset + phase] * 1000 for phase in range(self.phase_count)]
+            transition = self.frame_transitions[slot]
+            yield first_frame + index, self.frame_menus[slot], self.transition_names.get(transition, str(transition)), phase_times
+
+    def summary(self):
+        groups: Dict[str, List[List[float]]] = {}
+        for _, menu, transition, phase_times in self.frame_rows():
+            groups.setdefault(f"{menu}/{transition}", []).append(phase_times)
+
+        summary = {}
+        for group, frames in groups.items():
+            group_summary = {'frames': len(frames)}
+            for phase, phase_name in enumerate(PHASE_NAMES + ['total']):
+                if phase_name == 'total':
+                    values = sorted(sum(phase_times) for phase_times in frames)
+                else:
+                    values = sorted(phase_times[phase] for phase_times in frames)
+                group_summary[phase_name] = {
+                    'mean_ms': round(sum(values) / len(values), 4),
+                    'p95_ms': round(values[min(int(len(values) * 0.95), len(values) - 1)], 4),
+                    'max_ms': round(values[-1], 4),
+                }
+            summary[group] = group_summary
+        return summary
+
+    def write_csv(self, file_name):
+        with open(file_name, "w", newline='') as openfile:
+            writer = csv.writer(openfile)
+            writer.writerow(['frame', 'menu', 'transition'] + [f"{phase_name}_ms" for phase_name in PHASE_NAMES] + ['total_ms'])
+            for frame, menu, transition, phase_times in self.frame_rows():
+                writer.writerow([frame, menu, transition] + [round(phase_time, 4) for phase_time in phase_times] + [round(sum(phase_times), 4)])
+
+    def write_json(self, file_name):
+        with open(file_name, "w") as openfile:
+            json.dump({'frames_recorded': min(self.frame_count, self.capacity), 'frames_total': self.frame_count, 'groups': self.summary()}, openfile, indent=2)
+
+    def dump(self, file_prefix):
+        self.write_csv(file_prefix + ".csv")
+        self.write_json(file_prefix + ".json")
@@ -0,0 +1,81 @@
+from __future__ import annotations
+import pygame
+from pygame.font import Font
+from collections import OrderedDict
+
+
+class GlyphAtlas:
+    # Shared cache of rendered glyphs keyed by (font, character, color, scale).
+    # Scaled glyphs are the animation frames of a letter, scale is quantized so frames get reused.
+    # Least recently used glyphs are evicted once the cache grows over max_bytes.
+    def __init__(self, max_bytes = 4 * 1024 * 1024, scale_step = 0.02) -> None:
+        self.max_bytes = max_bytes
+        self.scale_step = scale_step
+        self.glyphs: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize_scale(self, scale):
+        return round(round(scale / self.scale_step) * self.scale_step, 4)
+
+    def get(self, font: Font, character: str, color, scale = 1.0) -> pygame.Surface:
+        key = (font, character, color, scale)
+        glyph = self.glyphs.get(key)
+        if glyph is None: # retry with the normalized key before rendering
+            key = (font, character, tuple(int(channel) for channel in color), self.quantize_scale(scale))
+            glyph = self.glyphs.get(key)
+        if glyph is not None:
+            self.hits += 1
+            self.glyphs.move_to_end(key)
+            return glyph
+
+        self.misses += 1
+        _, _, color, scale = key
+        if scale == 1:
+            glyph = font.render(character, True, color)
+        else:
+            glyph = pygame.transform.smoothscale_by(self.get(font, character, color), scale)
+        self._store(key, glyph)
+        return glyph
+
+    def prerender_scales(self, font: Font, character: str, color, min_scale, max_scale):
+        scale = self.quantize_scale(min_scale)
+        while scale <= max_scale:
+            self.get(font, character, color, scale)
+            scale = self.quantize_scale(scale + self.scale_step)
+
+    def render_text(self, font: Font, text: str, color) -> pygame.Surface:
+        # Composes a string from cached glyphs, advancing by each glyph's metrics
+        text_surface = pygame.Surface(font.size(text), pygame.SRCALPHA)
+        x = 0
+        for character, metrics in zip(text, font.metrics(text)):
+            text_surface.blit(self.get(font, character, color), (x, 0))
+            x += metrics[4] if metrics else font.size(character)[0]
+        return text_surface
+
+    def _store(self, key, glyph: pygame.Surface):
+        self.glyphs[key] = glyph
+        self.used_bytes += glyph.get_width() * glyph.get_height() * glyph.get_bytesize()
+        while self.used_bytes > self.max_bytes and len(self.glyphs) > 1:
+            _, evicted_glyph = self.glyphs.popitem(last=False)
+            self.used_bytes -= evicted_glyph.get_width() * evicted_glyph.get_height() * evicted_glyph.get_bytesize()
+            self.evictions += 1
+
+    def clear(self): # counters restart too, so stats() only describe the new contents
+        self.glyphs.clear()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {
+            'glyphs': len(self.glyphs),
+            'used_bytes': self.used_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+
+try:
+    import numpy as np
+except ImportError: # hints are left out without numpy
+    np = None
+
+from rules import HIDDEN_LETTER, LETTER_BITS
+from wordstore import WordStore
+
+HINT_LATENCY_BUDGET = 0.005 # seconds, a hint has to fit in a frame
+HINTS_AVAILABLE = np is not None
+
+
+class LengthBucket:
+    # Words of one length as a (length, words) matrix of uppercase ascii codes and a 26-bit letter mask per word
+    def __init__(self, columns, masks) -> None:
+        self.columns = columns
+        self.masks = masks
+
+
+class HintEngine:
+    # Suggests the letter whose guess tells the most about the answer: candidate words are the words that
+    # fit the revealed pattern and contain no wrong letter, and the best letter splits them closest to half
+    # (highest entropy of "answer contains the letter"). Filtering and scoring are numpy operations over
+    # per length buckets built once at load. Huge candidate sets are scored on an even sample, sized at load
+    # so the slowest kind of query takes a quarter of the latency budget. Opening hints (nothing guessed)
+    # filter nothing but the length, they are worked out at load.
+    def __init__(self, words, max_scored_candidates = 20000, max_cached_hints = 4096, latency_budget = HINT_LATENCY_BUDGET) -> None:
+        self.max_scored_candidates = max_scored_candidates
+        self.max_cached_hints = max_cached_hints
+        self.cached_hints: Dict[tuple, str] = {} # early game states repeat a lot and filter the least, so they cost the most
+        self.opening_hints: Dict[int, str] = {} # word length: hint before the first guess, never evicted
+        self.buckets: Dict[int, LengthBucket] = {}
+        self.letter_bits = np.zeros(256, dtype=np.uint32) # character code -> letter bit, 0 for non-letters
+        for letter, bit in LETTER_BITS.items():
+            self.letter_bits[ord(letter)] = bit
+        self.bit_shifts = np.arange(26, dtype=np.uint32)
+        self.last_query_time = 0.0
+        self.slowest_query_time = 0.0
+
+        if isinstance(words, WordStore): # views into the mapped file, nothing is copied
+            blob = np.frombuffer(words.map, dtype=np.uint8, offset=words.blob_start)
+            offsets = np.frombuffer(words.map, dtype='<u4', count=len(words) + 1, offset=words.offsets_start).astype(np.int64)
+        else:
+            encoded_words = [word.encode('ascii', 'replace') for word in words]
+            blob = np.frombuffer(b''.join(encoded_words), dtype=np.uint8)
+            offsets = np.zeros(len(encoded_words) + 1, dtype=np.int64)
+            np.cumsum([len(word) for word in encoded_words], out=offsets[1:])
+        lengths = np.diff(offsets)
+        uppercase = np.arange(256, dtype=np.uint8)
+        uppercase[ord('a'):ord('z') + 1] -= 32
+
+        for length in np.unique(lengths).tolist():
+            if length == 0:
+                continue
+            starts = offsets[:-1][lengths == length]
+            columns = uppercase[blob[starts[None, :] + np.arange(length)[:, None]]] # (length, words)
+            masks = np.bitwise_or.reduce(self.letter_bits[columns], axis=0)
+            self.buckets[length] = LengthBucket(np.ascontiguousarray(columns), masks)
+
+        self.fit_to_budget(latency_budget)
+        for length, bucket in self.buckets.items():
+            self.opening_hints[length] = self.score_rows(bucket, np.arange(bucket.masks.size), 0)
+
+    def fit_to_budget(self, latency_budget):
+        # Times a worst case query, only the first letter revealed, on the largest bucket and
+        # shrinks the sample until it fits in a quarter of the budget
+        if not self.buckets:
+            return
+        length, bucket = max(self.buckets.items(), key=lambda item: (item[1].masks.size, item[0]))
+        common_letter = chr(int(np.argmax(np.bincount(bucket.columns[0], minlength=256))))
+        pattern = common_letter + HIDDEN_LETTER * (length - 1)
+        guessed_mask = LETTER_BITS.get(common_letter, 0)
+        for _ in range(4):
+            start = time.perf_counter()
+            self._best_letter(pattern, guessed_mask)
+            query_time = time.perf_counter() - start
+            if query_time <= latency_budget / 4 or self.max_scored_candidates <= 1000:
+                break
+            self.max_scored_candidates = max(int(self.max_scored_candidates * latency_budget / 4 / query_time), 1000)
+
+    def candidate_rows(self, pattern: str, guessed_mask: int, max_rows = None):
+        # Rows of the words in pattern's length bucket that can still be the answer, cheapest filter first:
+        # the masks (every revealed letter, no wrong one), then revealed positions, then hidden positions.
+        # With max_rows, more rows than that are thinned to an even sample before the hidden position
+        # filter, the costliest one, which leaves an even sample of the candidates.
+        bucket = self.buckets.get(len(pattern))
+        if bucket is None:
+            return None, None
+        revealed_mask = 0
+        for character in pattern:
+            revealed_mask |= LETTER_BITS.get(character, 0)
+        checked_mask = np.uint32(guessed_mask | revealed_mask)
+
+        rows = np.flatnonzero((bucket.masks & checked_mask) == np.uint32(revealed_mask))
+        hidden_positions = []
+        for position, character in enumerate(pattern):
+            if character == HIDDEN_LETTER:
+                hidden_positions.append(position)
+            elif rows.size:
+                rows = rows[bucket.columns[position][rows] == ord(character)]
+        if revealed_mask: # a revealed letter shows at all of its positions, hidden ones can't be it
+            if max_rows is not None and rows.size > max_rows:
+                sampled_rows = self.hidden_position_filter(bucket, rows[::-(-rows.size // max_rows)], hidden_positions, revealed_mask)
+                if sampled_rows.size: # else the few candidates there are may all be outside the sample
+                    return bucket, sampled_rows
+            rows = self.hidden_position_filter(bucket, rows, hidden_positions, revealed_mask)
+        return bucket, rows
+
+    def hidden_position_filter(self, bucket: LengthBucket, rows, hidden_positions, revealed_mask):
+        for position in hidden_positions:
+            if not rows.size:
+                break
+            rows = rows[(self.letter_bits[bucket.columns[position][rows]] & np.uint32(revealed_mask)) == 0]
+        return rows
+
+    def best_letter(self, pattern: str, guessed_mask: int):
+        # None when no word fits or every letter of the candidates is guessed
+        start = time.perf_counter()
+        key = (pattern, guessed_mask)
+        if not guessed_mask and len(pattern) in self.opening_hints and pattern == HIDDEN_LETTER * len(pattern):
+            letter = self.opening_hints[len(pattern)]
+        elif key in self.cached_hints:
+            letter = self.cached_hints[key]
+        else:
+            letter = self._best_letter(pattern, guessed_mask)
+            if len(self.cached_hints) >= self.max_cached_hints:
+                self.cached_hints.clear()
+            self.cached_hints[key] = letter
+        self.last_query_time = time.perf_counter() - start
+        self.slowest_query_time = max(self.slowest_query_time, self.last_query_time)
+        return letter
+
+    def _best_letter(self, pattern, guessed_mask):
+        bucket, rows = self.candidate_rows(pattern, guessed_mask, self.max_scored_candidates)
+        if bucket is None or not rows.size:
+            return None
+        if rows.size > self.max_scored_candidates:
+            rows = rows[::-(-rows.size // self.max_scored_candidates)]
+        return self.score_rows(bucket, rows, guessed_mask)
+
+    def score_rows(self, bucket: LengthBucket, rows, guessed_mask):
+        # letter counts straight from the masks, one pass over the candidates per letter
+        masks = bucket.masks[rows]
+        counts = np.array([np.count_nonzero(masks & np.uint32(1 << shift)) if not guessed_mask >> shift & 1 else 0 for shift in range(26)], dtype=np.int64)
+        if not counts.any():
+            return None
+        share = counts / rows.size
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entropy = -np.nan_to_num(share * np.log2(share)) - np.nan_to_num((1 - share) * np.log2(1 - share))
+        entropy[counts == 0] = -1
+        best = np.lexsort((counts, entropy))[-1] # highest entropy, ties go to the more common letter
+        return chr(ord('A') + best)
+
+
+def load_hint_engine(words) -> Future: # built in a background thread, or right away without threads (pygbag)
+    if sys.platform == 'emscripten':
+        future = Future()
+        try:
+            future.set_result(HintEngine(words))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+    executor = ThreadPoolExecutor(1, thread_name_prefix='hint_engine')
+    future = executor.submit(HintEngine, words)
+    executor.shutdown(wait=False)
+    return future
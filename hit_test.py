@@ -0,0 +1,39 @@
+from __future__ import annotations
+import pygame
+from typing import Dict, Tuple
+
+
+class HitTestGrid:
+    # Uniform grid over the rects of a menu's clickable objects.
+    # Each cell lists the objects overlapping it, top-most (last drawn) first, so a lookup checks only a few rects.
+    def __init__(self, cell_size = 64) -> None:
+        self.cell_size = cell_size
+        self.cells: Dict[int, Tuple] = {}
+        self.object_count = 0
+
+    def cell_key(self, cell_x, cell_y):
+        return (cell_y << 16) | (cell_x & 0xFFFF)
+
+    def build(self, objects): # objects in draw order
+        cells: Dict[int, list] = {}
+        cell_size = self.cell_size
+        self.object_count = 0
+        for object in objects:
+            rect: pygame.Rect = object.rect
+            if rect is None:
+                continue
+            self.object_count += 1
+            for cell_y in range(rect.top // cell_size, (rect.bottom - 1) // cell_size + 1):
+                for cell_x in range(rect.left // cell_size, (rect.right - 1) // cell_size + 1):
+                    cells.setdefault(self.cell_key(cell_x, cell_y), []).append(object)
+        self.cells = {key: tuple(reversed(cell_objects)) for key, cell_objects in cells.items()}
+
+    def find(self, position):
+        x, y = position
+        cell_objects = self.cells.get(self.cell_key(int(x) // self.cell_size, int(y) // self.cell_size))
+        if cell_objects is None:
+            return None
+        for object in cell_objects:
+            if object.rect.collidepoint(x, y) and object.is_visible():
+                return object
+        return None
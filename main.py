@@ -1,58 +1,101 @@
 from __future__ import annotations
 import pygame
 import asyncio
+import argparse
 import string
-from typing import List, Dict, Type
+from typing import List, Dict, Sequence
 import random
 random.seed()
 import os
+import sys
+import time
 from effects import Fireworks, EffectController
+from glyph_atlas import GlyphAtlas
+from scene import Scene
+from assets import AssetLoader
+from wordstore import open_wordlist
+from word_scheduler import WordScheduler
+from hints import HintEngine, HINTS_AVAILABLE, load_hint_engine
+from rules import RoundState, DIFFICULTY_BUCKETS, EASY_MODE, HARD_MODE, MAX_HEALTH, ROUND_IN_PROGRESS, ROUND_LOST, ROUND_WON, GUESS_IGNORED, GUESS_WRONG
+from timing import Tween, game_clock
+from replay import InputRecorder, InputReplay, SessionLog, new_seeds, compare_summaries
+from frame_profiler import FrameProfiler, EVENTS_PHASE, EFFECTS_UPDATE_PHASE, EFFECTS_DRAW_PHASE, GAME_UPDATE_PHASE, GAME_DRAW_PHASE, DISPLAY_PHASE, TICK_PHASE, MENU_BUILD_PHASE
 import webbrowser
+from concurrent.futures import Future
 from pygame.font import Font
 
 class Game:
-    def __init__(self, screen: pygame.Surface, answer_object: AnswerObject, heart_object: HeartObject, score_object: ScoreObject) -> None:
+    def __init__(self, screen: pygame.Surface, answer_object: AnswerObject, score_object: ScoreObject) -> None:
         self.screen = screen
         self.answer_object = answer_object
-        self.heart_object = heart_object
+        self.heart_object: HeartObject = None # added with the play menu
         self.score_object = score_object
         self.input_frozen = False
         self.difficulty_mode = None
         self.default_freeze_time = 400
         self.freeze_time = 400 # milliseconds
         self.freeze_time_start = 0
-        self.word_list: List[str] = []
+        self.word_list: Sequence[str] = [] # WordList, or a WordStore for compiled wordlists
+        self.word_scheduler: WordScheduler = None
+        self.hint_engine: HintEngine = None # built on the first hint key press, None without numpy
+        self.hint_engine_future: Future = None
+        self.hint_pending = False # a hint was asked for while the engine was still building
+        self.random = random.Random() # free letters of easy mode
         self.game_ended = NOT_ENDED
-        self.guessed_letters = []
+        self.round: RoundState = None # rules state of the current word, the answer and hearts show it
+        self.scenes: Dict[str, Scene] = {menu: Scene(menu) for menu in (START_MENU, PLAY_MENU, SCORE_MENU)}
         self.current_menu = START_MENU
+        self.scene = self.scenes[START_MENU] # switched with the menu, everything per frame goes through it
         self.letter_buttons: List[LetterButton] = []
-        self.start_menu_objects: Dict[str, List[Type[GameObject]]] = {} # Dic, {object_type, [list of objects]}
-        self.play_menu_objects: Dict[str, List[Type[GameObject]]] = {}
-        self.score_menu_objects: Dict[str, List[Type[GameObject]]] = {}
+        self.letter_button_map: Dict[str, LetterButton] = {} # uppercase letter -> button
+        self.letter_key_map: Dict[int, LetterButton] = {} # pygame key code -> button
+        self.menu_builders: Dict[str, tuple] = {} # menus still waiting for assets, {menu, (asset names, build function)}
         
         self.transition_screen = None
         self.menu_transitioning_state = NO_TRANSITION
         self.transitioning_to = None
         self.transition_in_time = 200 # milliseconds
         self.transition_out_time = 200 # milliseconds
-        self.transition_in_start_time = 0 # milliseconds
-        self.transition_out_start_time = 0 # milliseconds
+        self.transition_in_tween = Tween(self.transition_in_time) # fade to the transition color
+        self.transition_out_tween = Tween(self.transition_out_time) # and back, showing the new menu
         self.transition_screen = pygame.Surface(screen.get_size())
 
         self.scorescreen_delay_time = 1000
         self.scorescreen_delay_start_time = 0
 
         self.add_object(PLAY_MENU, answer_object)
-        self.add_object(PLAY_MENU, heart_object)
         self.add_object(SCORE_MENU, score_object)
 
-        list_of_words = read_wordlist(wordlist_file)
+        list_of_words = open_wordlist(wordlist_file)
         self.set_word_selection(list_of_words)
 
-        self.create_letter_buttons()
         self.score_object.reset_streak("")
-        self.heart_object.set_max_health(8)
-        self.answer_object.set_answer(random.choice(self.word_list))
+        self.round = RoundState(self.random.choice(self.word_list), MAX_HEALTH)
+        self.answer_object.set_round(self.round)
+
+    def set_heart_object(self, heart_object: HeartObject):
+        self.heart_object = heart_object
+        self.add_object(PLAY_MENU, heart_object)
+        self.heart_object.set_max_health(MAX_HEALTH)
+
+    def add_menu_builder(self, menu, asset_names, build_function):
+        self.menu_builders[menu] = (asset_names, build_function)
+
+    def build_ready_menus(self): # builds the next waiting menu once all of its assets are loaded, never waits
+        for menu, (asset_names, _) in self.menu_builders.items():
+            if assets.ready(asset_names):
+                self.build_menu(menu)
+            break
+
+    def build_menu(self, menu): # waits for assets still loading, menus added before it are built first
+        if menu not in self.menu_builders:
+            return
+        while menu in self.menu_builders:
+            next_menu = next(iter(self.menu_builders))
+            asset_names, build_function = self.menu_builders.pop(next_menu)
+            assets.wait(asset_names)
+            build_function()
+        self.reposition_objects(self.screen.get_size())
 
     def start_easy_game(self):
         self.difficulty_mode = EASY_MODE
@@ -66,6 +109,14 @@ class Game:
         self.reposition_menu_objects(screen_size)
         self.reposition_text_objects(screen_size)
         self.reposition_letter_buttons(screen_size)
+        self.invalidate_hit_test()
+
+    def invalidate_hit_test(self): # call after moving buttons outside of reposition_objects
+        for scene in self.scenes.values():
+            scene.hit_test_grids = {}
+
+    def get_button_at(self, position):
+        return self.scene.get_hit_test_grid(BUTTON_OBJECT_TYPE).find(position)
 
     def reposition_text_objects(self, screen_size):
         screen_size_x, screen_size_y = screen_size
@@ -78,70 +129,76 @@ class Game:
 
     def reposition_menu_objects(self, screen_size):
         screen_size_x, screen_size_y = screen_size
-        for object_list in self.score_menu_objects.values(): # SCORE_MENU
-            for object in object_list:
-                if object.id == NEXT_BUTTON_ID:
-                    object.rect.center = screen_size_x // 2, screen_size_y // 3 * 2
-                elif object.id == TRY_AGAIN_BUTTON_ID:
-                    object.rect.center = screen_size_x // 2, screen_size_y // 3 * 2
-                elif object.id == GAME_OVER_ID:
-                    object.update_rect_center((screen_size_x // 2, screen_size_y // 3 * 1))
-                elif object.id == YOU_WIN_ID:
-                    object.update_rect_center((screen_size_x // 2, screen_size_y // 3 * 1))
-                elif object.id == SCORE_ID:
-                    object.update_rect_center((screen_size_x // 2, screen_size_y // 2))
-
-        for object_list in self.start_menu_objects.values(): # START_MENU
-            for object in object_list:
-                if object.id == START_EASY_BUTTON_ID:
-                    object.rect.center = screen_size_x // 2 - (start_easy_game_pressed_scaled.get_size()[0] / 2) - (BUTTON_SEPARATION_AMOUNT / 2), screen_size_y // 3 * 2
-                elif object.id == START_HARD_BUTTON_ID:
-                    object.rect.center = screen_size_x // 2 + (start_hard_game_pressed_scaled.get_size()[0] / 2) + (BUTTON_SEPARATION_AMOUNT / 2), screen_size_y // 3 * 2
-                elif object.id == LOGO_MAIN_ID:
-                    object.update_rect_center((screen_size_x // 2, screen_size_y // 3 * 1))
-
-        for object_list in self.play_menu_objects.values(): # PLAY_MENU
-            for object in object_list:
-                if object.id == BACK_BUTTON_ID:
-                    game_logo_surface = logo_game_button.surface
-                    game_logo_rect = game_logo_surface.get_rect()
-                    object.rect.midright = screen_size_x - 10, game_logo_rect.center[1] - 10
-                elif object.id == LOGO_GAME_ID:
-                    object.update_rect_topleft((0, 0))
-                elif object.id == LOGO_BACKGROUND_ID:
-                    object.update_rect_center((screen_size_x // 2, screen_size_y // 2))
-                elif object.id == HEART_ID:
-                    game_logo_surface = logo_game_button.surface
-                    game_logo_rect = game_logo_surface.get_rect()
-                    object.update_rect_center((game_logo_rect.center[0], game_logo_surface.get_size()[1] + object.surface.get_size()[1] / 2))
+        for object in self.scenes[SCORE_MENU].draw_list:
+            if object.id == NEXT_BUTTON_ID:
+                object.rect.center = screen_size_x // 2, screen_size_y // 3 * 2
+            elif object.id == TRY_AGAIN_BUTTON_ID:
+                object.rect.center = screen_size_x // 2, screen_size_y // 3 * 2
+            elif object.id == GAME_OVER_ID:
+                object.update_rect_center((screen_size_x // 2, screen_size_y // 3 * 1))
+            elif object.id == YOU_WIN_ID:
+                object.update_rect_center((screen_size_x // 2, screen_size_y // 3 * 1))
+            elif object.id == SCORE_ID:
+                object.update_rect_center((screen_size_x // 2, screen_size_y // 2))
+
+        for object in self.scenes[START_MENU].draw_list:
+            if object.id == START_EASY_BUTTON_ID:
+                object.rect.center = screen_size_x // 2 - (start_easy_game_pressed_scaled.get_size()[0] / 2) - (BUTTON_SEPARATION_AMOUNT / 2), screen_size_y // 3 * 2
+            elif object.id == START_HARD_BUTTON_ID:
+                object.rect.center = screen_size_x // 2 + (start_hard_game_pressed_scaled.get_size()[0] / 2) + (BUTTON_SEPARATION_AMOUNT / 2), screen_size_y // 3 * 2
+            elif object.id == LOGO_MAIN_ID:
+                object.update_rect_center((screen_size_x // 2, screen_size_y // 3 * 1))
+
+        for object in self.scenes[PLAY_MENU].draw_list:
+            if object.id == BACK_BUTTON_ID:
+                game_logo_surface = logo_game_button.surface
+                game_logo_rect = game_logo_surface.get_rect()
+                object.rect.midright = screen_size_x - 10, game_logo_rect.center[1] - 10
+            elif object.id == LOGO_GAME_ID:
+                object.update_rect_topleft((0, 0))
+            elif object.id == LOGO_BACKGROUND_ID:
+                object.update_rect_center((screen_size_x // 2, screen_size_y // 2))
+            elif object.id == HINT_ID:
+                object.update_rect_center((screen_size_x // 2, screen_size_y * 0.47)) # between the answer and the keyboard
+            elif object.id == HEART_ID:
+                game_logo_surface = logo_game_button.surface
+                game_logo_rect = game_logo_surface.get_rect()
+                object.update_rect_center((game_logo_rect.center[0], game_logo_surface.get_size()[1] + object.surface.get_size()[1] / 2))
         
     def create_letter_buttons(self):
         for letter in string.ascii_uppercase:
             new_letter = LetterButton(letter, letter, LETTER_BUTTON_FONT)
             self.add_object(PLAY_MENU, new_letter)
             self.letter_buttons.append(new_letter)
+            self.letter_button_map[letter.upper()] = new_letter
+            self.letter_key_map[ord(letter.lower())] = new_letter # letter key codes are their lowercase ascii values
 
     def set_word_selection(self, word_list):
         self.word_list = word_list
+        self.word_scheduler = WordScheduler(word_list, DIFFICULTY_BUCKETS, WORD_SCHEDULE_FILE)
+        self.hint_engine = None
+        self.hint_engine_future = None
+        self.hint_pending = False
 
-    def get_objects(self, object_type = None):
-        if self.current_menu == PLAY_MENU:
-            menu_dict = self.play_menu_objects
-        elif self.current_menu == START_MENU:
-            menu_dict = self.start_menu_objects
-        elif self.current_menu == SCORE_MENU:
-            menu_dict = self.score_menu_objects
-        else:
-            return None
+    def seed(self, game_seed, words_seed): # repeatable words and free letters, the saved word order is left alone
+        self.random.seed(game_seed)
+        self.word_scheduler = WordScheduler(self.word_list, DIFFICULTY_BUCKETS, None, words_seed)
 
-        if object_type is None:
-            return [object for values in menu_dict.values() for object in values]
-        
-        if object_type in menu_dict:
-            return [object for object in menu_dict[object_type]]
-        return None
+    def get_objects(self, object_type = None): # of the current menu, the lists are the scene's own so don't change them
+        return self.scene.get_objects(object_type)
+
+    def set_current_menu(self, menu):
+        self.current_menu = menu
+        self.scene = self.scenes[menu]
+
+    def is_won(self): # visibility of the win and lose screen objects
+        return self.game_ended == GAME_WON
+
+    def is_lost(self):
+        return self.game_ended == GAME_LOST
 
     def go_to_menu(self, menu):
+        self.build_menu(menu)
         if menu == START_MENU:
             self.score_object.reset_streak(self.difficulty_mode)
 
@@ -152,12 +209,13 @@ class Game:
         score_menu_effects.deactivate_effects()
 
     def go_to_website(self, link):
-        webbrowser.open(link)
+        if input_replay is None: # replays don't open browser tabs
+            webbrowser.open(link)
 
     def transition_in_finish(self):
-        self.transition_out_start_time = pygame.time.get_ticks()
+        self.transition_out_tween.start()
         self.menu_transitioning_state = TRANSITION_OUT
-        self.current_menu = self.transitioning_to
+        self.set_current_menu(self.transitioning_to)
         self.unfreeze_input()
         if self.current_menu == PLAY_MENU:
             self.start_new_game()
@@ -172,60 +230,94 @@ class Game:
 
     def start_menu_transition(self):
         self.transition_screen.fill(TRANSITION_SCREEN_COLOR)
-        self.transition_in_start_time = pygame.time.get_ticks()
+        self.transition_in_tween.start()
         game.input_frozen = True
 
     def start_new_game(self):
         self.game_ended = NOT_ENDED
-        new_word = random.choice(self.word_list)
-        self.answer_object.set_answer(new_word)
-        self.heart_object.set_max_health(8)
-        for object in self.letter_buttons:
-            object.change_button_state(BUTTON_UNPRESSED)
+        new_word = self.word_scheduler.next_word(self.difficulty_mode)
+        self.round = RoundState(new_word, MAX_HEALTH)
+        self.answer_object.set_round(self.round)
+        self.heart_object.set_max_health(self.round.max_health)
+        hint_object.clear_hint()
+        self.hint_pending = False
+        self.reset_all_buttons()
 
         if self.difficulty_mode == EASY_MODE:
-            random_letter = random.choice(new_word)
-            for object in self.letter_buttons:
-                if object.letter.upper() == random_letter.upper():
-                    object.activate()
+            random_letter = self.random.choice(new_word)
+            letter_button = self.get_letter_button(random_letter)
+            if letter_button is not None:
+                letter_button.activate()
+
+    def guess_letter(self, letter: str):
+        result = self.round.guess(letter)
+        self.answer_object.show_guess(letter, result)
+        if result == GUESS_IGNORED:
+            return
+        hint_object.clear_hint()
+        self.hint_pending = False
+
+        letter_button = self.get_letter_button(letter)
+        if result == GUESS_WRONG:
+            self.heart_object.set_health(self.round.health)
+            if letter_button is not None:
+                letter_button.change_button_state(BUTTON_PRESSED_INCORRECT)
+        elif letter_button is not None:
+            letter_button.change_button_state(BUTTON_PRESSED_CORRECT)
+
+        if self.round.outcome == ROUND_WON:
+            self.game_won()
+        elif self.round.outcome == ROUND_LOST:
+            self.game_lost()
+
+    def show_hint(self):
+        if not HINTS_AVAILABLE or self.round.is_over():
+            return
+        if self.hint_engine is None:
+            # The engine takes a while and a lot of memory on big wordlists, so it's only built when a player
+            # wants hints, off the main thread. The hint shows when it's ready.
+            if self.hint_engine_future is None:
+                self.hint_engine_future = load_hint_engine(self.word_list)
+            self.hint_pending = True
+            hint_object.show_loading()
+            return
+        hint_object.show_hint(self.hint_engine.best_letter(self.round.revealed_text(), self.round.guessed_mask))
+
+    def update_hint_engine(self):
+        if self.hint_pending and self.hint_engine_future.done():
+            self.hint_engine = self.hint_engine_future.result()
+            self.hint_pending = False
+            self.show_hint()
+
+    def reset_all_buttons(self):
+        for letter_button in self.letter_buttons:
+            letter_button.reset_button()
 
 
     def draw(self, screen: pygame.Surface):
-        menu_dict = {}
-        if self.current_menu == PLAY_MENU:
-            menu_dict = self.play_menu_objects
-        elif self.current_menu == START_MENU:
-            menu_dict = self.start_menu_objects
-        elif self.current_menu == SCORE_MENU:
-            menu_dict = self.score_menu_objects
-        
-        if menu_dict:
-            for object_list in menu_dict.values():
-                for object in object_list:
-                    object.draw(screen)
+        self.scene.draw(screen)
 
         if (self.menu_transitioning_state == TRANSITION_IN or self.menu_transitioning_state == TRANSITION_OUT) and self.transition_screen is not None:
-            ticks = (pygame.time.get_ticks() - self.transition_in_start_time)
+            render_time = game_clock.render_time()
             if self.menu_transitioning_state == TRANSITION_IN:
-                alpha = 255 - (255 * ((self.transition_in_time - ticks) / self.transition_in_time))
+                alpha = 255 * self.transition_in_tween.progress(render_time)
             else:
-                alpha = 255 + (255 * ((self.transition_out_time- ticks) / self.transition_out_time))
+                alpha = 255 * (1 - self.transition_out_tween.progress(render_time))
             self.transition_screen.set_alpha(alpha)
             screen.blit(self.transition_screen, self.transition_screen.get_rect())
 
-    def update(self):
-        ticks = pygame.time.get_ticks()
+    def update(self): # one clock step
+        ticks = game_clock.now()
+        self.update_hint_engine()
         
         if self.menu_transitioning_state != NO_TRANSITION:
 
             if self.menu_transitioning_state == TRANSITION_IN:
-                elapsed_time = ticks - self.transition_in_start_time
-                if elapsed_time >= self.transition_in_time:
+                if self.transition_in_tween.is_finished(ticks):
                     self.transition_in_finish()
 
             elif self.menu_transitioning_state == TRANSITION_OUT:
-                elapsed_time = ticks - self.transition_out_start_time
-                if elapsed_time >= self.transition_in_time:
+                if self.transition_out_tween.is_finished(ticks):
                     self.transition_out_finish()
 
             elif self.menu_transitioning_state == SCORE_SCREEN_DELAY:
@@ -233,32 +325,38 @@ class Game:
                 if elapsed_time >= self.scorescreen_delay_time:
                     self.score_screen_delay_finish()
 
-        menu_dict = {}
-        if self.current_menu == PLAY_MENU:
-            menu_dict = self.play_menu_objects
-        elif self.current_menu == START_MENU:
-            menu_dict = self.start_menu_objects
-        elif self.current_menu == SCORE_MENU:
-            menu_dict = self.score_menu_objects
-        
-        
-        if menu_dict:
-            for object_list in menu_dict.values():
-                for object in object_list:
-                    object.update()
+        self.scene.update()
 
         if self.input_frozen:
             elapsed_time = ticks - self.freeze_time_start
             if elapsed_time >= self.freeze_time:
                 self.unfreeze_input()
             
-    def get_letter_button(self, letter: str):
-        letter = letter.upper()
-        return [letter_button for letter_button in self.letter_buttons if letter_button.letter.upper() == letter][0]
+    def next_deadline(self): # earliest game time an update has to run at, None when nothing is pending
+        now = game_clock.now()
+        if self.menu_transitioning_state in (TRANSITION_IN, TRANSITION_OUT) or self.menu_builders or self.hint_pending: # fading, or waiting for images or the hint engine
+            return now
+        deadlines = []
+        if self.menu_transitioning_state == SCORE_SCREEN_DELAY:
+            deadlines.append(self.scorescreen_delay_start_time + self.scorescreen_delay_time)
+        if self.input_frozen:
+            deadlines.append(self.freeze_time_start + self.freeze_time)
+        deadline = self.scene.next_deadline(now)
+        if deadline is not None:
+            deadlines.append(deadline)
+        return min(deadlines) if deadlines else None
+
+    def get_letter_button(self, letter: str): # None if there is no button for the letter
+        return self.letter_button_map.get(letter.upper())
+
+    def get_letter_button_for_key(self, key: int):
+        return self.letter_key_map.get(key)
 
     def reposition_letter_buttons(self, screen_size):
+        if not self.letter_buttons: # play menu not built yet
+            return
         keyboard_rect = create_keyboard_zone(screen_size)
-        background_image_size = letter_button_unpressed_scaled.get_size()
+        background_image_size = self.letter_buttons[0].image_list[BUTTON_UNPRESSED].get_size()
         # X spacing
         size_multiplier_x = 1.2
         margin_x = 0 
@@ -287,19 +385,17 @@ class Game:
                     next_pos = (letters_per_row - (len(self.letter_buttons) - letter_counter)) // 2 # skip towards center
                     letter_column = next_pos
 
-    def add_object(self, game_state, object: GameObject):
-        menu_dict = {}
-        if game_state == PLAY_MENU:
-            menu_dict = self.play_menu_objects
-        elif game_state == START_MENU:
-            menu_dict = self.start_menu_objects
-        elif game_state == SCORE_MENU:
-            menu_dict = self.score_menu_objects
-        
-        if object.object_type not in menu_dict:
-            menu_dict[object.object_type] = []
-            
-        menu_dict[object.object_type].append(object)
+    def add_object(self, game_state, object: GameObject, visible_when = None): # visible_when: predicate for objects shown only some of the time
+        if visible_when is not None:
+            object.visible_when = visible_when
+        self.scenes[game_state].add(object)
+        object.menus.append(game_state)
+        if object.next_deadline() is not None:
+            self.schedule_update(object)
+
+    def schedule_update(self, object: GameObject): # call when an object starts an animation or timer, updates run until its next_deadline is None
+        for menu in object.menus:
+            self.scenes[menu].schedule(object)
 
     def unfreeze_input(self):
         self.input_frozen = False
@@ -307,7 +403,7 @@ class Game:
 
     def freeze_input(self, delay=None):
         self.input_frozen = True
-        self.freeze_time_start = pygame.time.get_ticks()
+        self.freeze_time_start = game_clock.now()
         if delay:
             self.freeze_time = delay
 
@@ -315,27 +411,93 @@ class Game:
         self.score_object.add_streak(self.difficulty_mode)
         self.game_ended = GAME_WON
         self.freeze_input(self.scorescreen_delay_time + 250)
-        self.scorescreen_delay_start_time = pygame.time.get_ticks()
+        self.scorescreen_delay_start_time = game_clock.now()
         self.menu_transitioning_state = SCORE_SCREEN_DELAY
 
     def game_lost(self):
         self.score_object.reset_streak(self.difficulty_mode)
         self.game_ended = GAME_LOST
         self.freeze_input(self.scorescreen_delay_time + 250)
-        self.scorescreen_delay_start_time = pygame.time.get_ticks()
+        self.scorescreen_delay_start_time = game_clock.now()
         self.menu_transitioning_state = SCORE_SCREEN_DELAY
 
+class DirtyRectRenderer:
+    # Opt-in renderer that repaints only the areas of objects that changed since the last frame.
+    # Transitions and active effects cover the whole screen, those frames are drawn and flipped in full.
+    def __init__(self, game: Game, background_color) -> None:
+        self.game = game
+        self.background_color = background_color
+        self.draw_states: Dict[GameObject, tuple] = {}
+        self.drawn_menu = None
+        self.full_redraw = True
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def render(self, screen: pygame.Surface, effects: EffectController):
+        game = self.game
+        objects = game.get_objects() or []
+        full_screen_active = game.menu_transitioning_state in (TRANSITION_IN, TRANSITION_OUT) or effects.effects_active
+        if self.full_redraw or full_screen_active or self.drawn_menu != game.current_menu:
+            screen.fill(self.background_color)
+            effects.draw(screen)
+            game.draw(screen)
+            pygame.display.flip()
+            self.draw_states = {object: object.get_draw_state() for object in objects}
+            for object in objects:
+                object.dirty = False
+            self.drawn_menu = game.current_menu
+            self.full_redraw = full_screen_active # one more full frame to clear the last overlay
+            return
+
+        dirty_rects: List[pygame.Rect] = []
+        for object in objects:
+            draw_state = object.get_draw_state()
+            previous_state = self.draw_states.get(object)
+            if object.dirty or draw_state != previous_state:
+                if previous_state is not None:
+                    dirty_rects.append(pygame.Rect(previous_state[0]))
+                if draw_state is not None:
+                    dirty_rects.append(pygame.Rect(draw_state[0]))
+                self.draw_states[object] = draw_state
+                object.dirty = False
+
+        if not dirty_rects:
+            return
+
+        for dirty_rect in dirty_rects:
+            screen.set_clip(dirty_rect)
+            screen.fill(self.background_color, dirty_rect)
+            for object in objects:
+                if object.rect is not None and object.rect.colliderect(dirty_rect) and object.is_visible():
+                    object.draw(screen)
+        screen.set_clip(None)
+        pygame.display.update(dirty_rects)
+
 class GameObject:
+    __slots__ = ('id', 'rect', 'surface', 'object_type', 'menus', 'visible_when', 'dirty')
+
     def __init__(self, id: str) -> None:
         self.id = id
         self.rect: pygame.Rect = None
         self.surface: pygame.Surface = None
         self.object_type = None
+        self.menus: List[str] = [] # menus the object was added to
+        self.visible_when = None # predicate checked before drawing and hit testing, None for always visible
+        self.dirty = True # surface changed in place since last draw, used by DirtyRectRenderer
 
     def draw(self, screen: pygame.Surface):
         if self.surface is not None and self.rect is not None:
             screen.blit(self.surface, self.rect)
 
+    def is_visible(self):
+        return self.visible_when is None or self.visible_when()
+
+    def get_draw_state(self): # compared between frames to find changed objects
+        if self.surface is None or self.rect is None or not self.is_visible():
+            return None
+        return (tuple(self.rect), self.surface, self.surface.get_alpha())
+
     def update_rect_center(self, center):
         self.rect = self.surface.get_rect()
         self.rect.center = center
@@ -349,11 +511,17 @@ class GameObject:
 
     def set_surface(self, surface: pygame.Surface):
         self.surface = surface
+        self.dirty = True
 
     def update(self):
         pass
 
+    def next_deadline(self): # game time of the next update that changes the object, None while idle
+        return None
+
 class NonInteractiveObject(GameObject):
+    __slots__ = ('center', 'topleft')
+
     def __init__(self, id) -> None:
         super().__init__(id)
         self.object_type = NON_INTERACTIVE_OBJECT_TYPE
@@ -361,19 +529,15 @@ class NonInteractiveObject(GameObject):
         self.topleft = None
 
 class ImageObject(NonInteractiveObject):
+    __slots__ = ()
+
     def __init__(self, id, image) -> None:
         super().__init__(id)
         self.surface = image
 
-    def draw(self, screen):
-        if self.id == YOU_WIN_ID and game.game_ended != GAME_WON:
-            return
-        if self.id == GAME_OVER_ID and game.game_ended != GAME_LOST:
-            return
-        if self.surface is not None and self.rect is not None:
-            screen.blit(self.surface, self.rect)
-
 class HeartObject(ImageObject):
+    __slots__ = ('image_list', 'number_of_hearts', 'heart_x_spacing', 'heart_surface', 'health_surfaces', 'health')
+
     def __init__(self, id, heart_full: pygame.Surface, heart_half: pygame.Surface, heart_empty: pygame.Surface) -> None:
         super().__init__(id, heart_empty)
         self.image_list = {
@@ -382,56 +546,59 @@ class HeartObject(ImageObject):
             HEART_EMPTY: heart_empty.copy()
         }
         self.number_of_hearts = 0
-        self.previous_hearts = 0
+        self.heart_x_spacing = 5
         self.heart_surface = None
+        self.health_surfaces: List[pygame.Surface] = [] # heart bar for every health value, index is health
         self.health = 0
 
     def set_max_health(self, max_health):
-        self.number_of_hearts = int((max_health / 2) + 0.5)
+        number_of_hearts = int((max_health / 2) + 0.5)
+        if number_of_hearts != self.number_of_hearts or not self.health_surfaces:
+            self.number_of_hearts = number_of_hearts
+            self._build_health_surfaces()
         self.health = max_health
         self._update_heart_surface()
 
-    def remove_health(self, number):
-        self.health -= number
+    def set_health(self, health):
+        self.health = health
         self._update_heart_surface()
 
     def get_health(self):
         return self.health
 
-    def _update_heart_surface(self):
-        heart_x_spacing = 5
+    def _build_health_surfaces(self):
+        # Two strips hold every heart bar: full hearts followed by empty ones, with a half heart between them in the
+        # odd strip. The bar for a health value is a window into one strip, so bars are views sharing the strip pixels.
         heart_x_size, heart_y_size = self.image_list[HEART_FULL].get_size()
+        heart_slot_size = heart_x_size + self.heart_x_spacing
+        number_of_hearts = self.number_of_hearts
+        strips = []
+        for middle_hearts in ([], [HEART_HALF]):
+            heart_types = [HEART_FULL] * number_of_hearts + middle_hearts + [HEART_EMPTY] * number_of_hearts
+            strip = pygame.Surface((heart_slot_size * len(heart_types), heart_y_size), pygame.SRCALPHA)
+            for heart_index, heart_type in enumerate(heart_types):
+                strip.blit(self.image_list[heart_type], (heart_slot_size * heart_index, 0))
+            strips.append(strip)
+
+        self.health_surfaces = []
+        for health in range(number_of_hearts * 2 + 1):
+            full_hearts = health // 2
+            window = pygame.Rect(heart_slot_size * (number_of_hearts - full_hearts), 0, heart_slot_size * number_of_hearts, heart_y_size)
+            self.health_surfaces.append(strips[health % 2].subsurface(window))
 
-        if not self.heart_surface or self.previous_hearts != self.number_of_hearts:
-            self.heart_surface = pygame.Surface(((heart_x_size + heart_x_spacing) * self.number_of_hearts, heart_y_size), pygame.SRCALPHA)
-
-        health = self.health
-        heart_index = 0
-        heart_type = HEART_EMPTY
-        for _ in range(self.number_of_hearts):
-            if health >= HEART_FULL:
-                health -= HEART_FULL
-                heart_type = HEART_FULL
-
-            elif health >= HEART_HALF:
-                health -= HEART_HALF
-                heart_type = HEART_HALF
-
-            else:
-                heart_type = HEART_EMPTY
-
-            heart_image = self.image_list[heart_type]
-            heart_image_rect = heart_image.get_rect()
-            heart_image_rect.topleft = ((heart_x_size + heart_x_spacing) * heart_index, 0)
-            self.heart_surface.blit(heart_image, heart_image_rect)
-            heart_index += 1
+    def _update_heart_surface(self):
+        health = min(max(self.health, 0), len(self.health_surfaces) - 1)
+        self.heart_surface = self.health_surfaces[health]
 
         temp_rect = self.heart_surface.get_rect()
         temp_rect.center = self.rect.center if self.rect else (0, 0)
         self.rect = temp_rect
         self.surface = self.heart_surface
+        self.dirty = True
 
 class TextObject(NonInteractiveObject):
+    __slots__ = ('text', 'font', 'color', 'temp_color', 'alpha')
+
     def __init__(self, id, font: Font, color = None) -> None:
         super().__init__(id)
         self.text = ''
@@ -453,9 +620,9 @@ class TextObject(NonInteractiveObject):
 
     def _update_surface(self):
         color = self.temp_color if self.temp_color is not None else self.color
-        self.surface = Font.render(self.font, self.text, True, color)
+        self.surface = glyph_atlas.render_text(self.font, self.text, color)
         temp_rect = self.surface.get_rect()
-        temp_rect.center = self.rect.center if self.rect else (0, 0)
+        temp_rect.center = self.rect.center if self.rect is not None else (0, 0)
         self.rect = temp_rect
         if self.alpha is not None and self.alpha != self.surface.get_alpha():
             self.surface.set_alpha(self.alpha)
@@ -465,9 +632,13 @@ class TextObject(NonInteractiveObject):
             screen.blit(self.surface, self.rect)
 
 class AnswerObject(TextObject):
+    __slots__ = ('round', 'draw_text', 'previous_letter_guessed', 'animation_state', 'animation_start_time', 'animation_start_delay',
+                 'wrong_letter_animation_time', 'correct_letter_animation_time', 'correct_letter_animation_scale', 'letter_dict',
+                 'last_letter_colored', 'color_animation_steps', 'prerender_animation_frames', 'surface_stale')
+
     def __init__(self, id, font: Font, color) -> None:
         super().__init__(id, font, color)
-        self.guessed_letters = []
+        self.round: RoundState = None
         self.draw_text = ''
         self.previous_letter_guessed = ''
         self.animation_state = NO_LETTER_ANIMATION
@@ -478,19 +649,25 @@ class AnswerObject(TextObject):
         self.correct_letter_animation_scale = 0.3
         self.letter_dict: Dict[str, Dict[str, pygame.Surface, str, str, str, tuple[int, int, int]]] = {}
         self.last_letter_colored = None
-
-    def set_answer(self, answer: str):
-        self.text = answer.upper()
-        self.draw_text = ''.join(['_' if letter in string.ascii_uppercase else letter for letter in answer.upper()])
+        self.color_animation_steps = 16
+        self.prerender_animation_frames = True
+        self.surface_stale = False # the animation moved on since the surface was built, rebuilt when next drawn
+
+    def set_round(self, round_state: RoundState):
+        self.round = round_state
+        self.text = round_state.answer
+        self.draw_text = round_state.revealed_text()
         self.temp_color = None
-        self.guessed_letters = []
         self.letter_dict = {}
         for index, character in enumerate(self.draw_text):
             self.letter_dict[str(index)] = {'letter': character, 'color': self.color}
+        if self.prerender_animation_frames: # correct guess animation frames, so guesses don't scale glyphs mid game
+            for letter in round_state.letter_positions:
+                glyph_atlas.prerender_scales(self.font, letter, CORRECT_COLOR, 1, 1 + self.correct_letter_animation_scale)
         self._update_surface()
 
     def set_text(self, text, color=None):
-        raise NotImplementedError("Setting text/answer to AnswerObject is used with set_answer")
+        raise NotImplementedError("Setting text/answer to AnswerObject is used with set_round")
         
     def _update_surface(self):
         letter_size_x, letter_size_y = self.font.size('_')
@@ -499,7 +676,7 @@ class AnswerObject(TextObject):
         word_surface = pygame.Surface((x_margin * 2 + (letter_size_x + letter_x_spacing) * len(self.draw_text), letter_size_y * (1 + self.correct_letter_animation_scale)), pygame.SRCALPHA)
         elapsed_time = 0
         if self.animation_state != NO_LETTER_ANIMATION:
-            elapsed_time = pygame.time.get_ticks() - self.animation_start_time
+            elapsed_time = game_clock.render_time() - self.animation_start_time
             if elapsed_time >= self.animation_start_delay:
                 animation_start_time = elapsed_time - self.animation_start_delay
                 if self.animation_state == CORRECT_LETTER_ANIMATION:
@@ -510,12 +687,13 @@ class AnswerObject(TextObject):
         color = self.temp_color if self.temp_color is not None else self.color
         for letter_values in self.letter_dict.values():
             if letter_values['letter'] != self.previous_letter_guessed and letter_values['color'] != color:
-                letter_image = Font.render(self.font, letter_values['letter'], True, color)
-                letter_values['surface'] = letter_image
+                letter_values['surface'] = glyph_atlas.get(self.font, letter_values['letter'], color)
+                letter_values['color'] = color
 
         for index, letter in enumerate(self.draw_text):
             if self.animation_state == WRONG_LETTER_ANIMATION and elapsed_time >= self.animation_start_delay:
-                color = tuple([MAIN_GREY_COLOR[i] + (self.color[i] - MAIN_GREY_COLOR[i]) * animation_fraction for i in range(3)])
+                color_fraction = round(animation_fraction * self.color_animation_steps) / self.color_animation_steps # limited number of fade colors keeps glyphs cached
+                color = tuple([int(MAIN_GREY_COLOR[i] + (self.color[i] - MAIN_GREY_COLOR[i]) * color_fraction) for i in range(3)])
             else:
                 if self.previous_letter_guessed == letter:
                     color = CORRECT_COLOR
@@ -523,20 +701,21 @@ class AnswerObject(TextObject):
                 else:
                     color = self.temp_color if self.temp_color is not None else self.color
 
-            if self.letter_dict[str(index)]['letter'] == '_':
-                letter_image = Font.render(self.font, letter, True, color)
-                self.letter_dict[str(index)]['surface'] = letter_image
-                self.letter_dict[str(index)]['letter'] = letter
-                self.letter_dict[str(index)]['color'] = color
+            letter_values = self.letter_dict[str(index)]
+            if letter_values['letter'] == '_':
+                letter_values['surface'] = glyph_atlas.get(self.font, letter, color)
+                letter_values['letter'] = letter
+                letter_values['color'] = color
             scaled_image = None
             if elapsed_time >= self.animation_start_delay:
                 if self.previous_letter_guessed == letter and self.animation_state == CORRECT_LETTER_ANIMATION:
                     if animation_fraction <= 0.5:
-                        scaled_image = pygame.transform.smoothscale_by(self.letter_dict[str(index)]['surface'], 1 + self.correct_letter_animation_scale * animation_fraction)
+                        scale = 1 + self.correct_letter_animation_scale * animation_fraction
                     else:
-                        scaled_image = pygame.transform.smoothscale_by(self.letter_dict[str(index)]['surface'], 1 + self.correct_letter_animation_scale - self.correct_letter_animation_scale * animation_fraction)
-            
-            finished_image = scaled_image if scaled_image else self.letter_dict[str(index)]['surface']
+                        scale = 1 + self.correct_letter_animation_scale - self.correct_letter_animation_scale * animation_fraction
+                    scaled_image = glyph_atlas.get(self.font, letter_values['letter'], letter_values['color'], scale)
+
+            finished_image = scaled_image if scaled_image else letter_values['surface']
             finished_image_rect = finished_image.get_rect()
             finished_image_rect.center = (x_margin + letter_size_x / 2 + (letter_size_x + letter_x_spacing) * index, word_surface.get_size()[1] / 2)
             word_surface.blit(finished_image, finished_image_rect)
@@ -548,62 +727,53 @@ class AnswerObject(TextObject):
         
     def update(self):
         if self.animation_state != NO_LETTER_ANIMATION:
-            elapsed_time = pygame.time.get_ticks() - self.animation_start_time
+            elapsed_time = game_clock.now() - self.animation_start_time
             if elapsed_time >= self.animation_start_delay:
                 if (elapsed_time > self.wrong_letter_animation_time and self.animation_state == WRONG_LETTER_ANIMATION) or (
                         elapsed_time > self.correct_letter_animation_time and self.animation_state == CORRECT_LETTER_ANIMATION):
                     self.animation_state = NO_LETTER_ANIMATION
-                
+            self.surface_stale = True # steps only move the animation on, the surface is built once per drawn frame
+
+    def refresh_surface(self):
+        if self.surface_stale:
+            self.surface_stale = False
             self._update_surface()
 
+    def draw(self, screen):
+        self.refresh_surface()
+        super().draw(screen)
+
+    def get_draw_state(self):
+        self.refresh_surface()
+        return super().get_draw_state()
+
+    def next_deadline(self):
+        return game_clock.now() if self.animation_state != NO_LETTER_ANIMATION else None
+
     def wrong_letter_animation(self):
         self.animation_state = WRONG_LETTER_ANIMATION
-        self.animation_start_time = pygame.time.get_ticks() + self.animation_start_delay
+        self.animation_start_time = game_clock.now() + self.animation_start_delay
+        game.schedule_update(self)
 
     def correct_letter_animation(self):
         self.animation_state = CORRECT_LETTER_ANIMATION
-        self.animation_start_time = pygame.time.get_ticks() + self.animation_start_delay
-
-    def check_letter(self, letter: str): # Returns True if word is solved, False if not
-        letter = letter.upper()
-        guessed_string = ''
-        correct_answer = self.text.upper()
-        guessed_letters = self.guessed_letters
-        self.previous_letter_guessed = letter
-        if letter in guessed_letters:
-            return
-        
-        self.animation_state == NO_LETTER_ANIMATION
-        
-        self.guessed_letters.append(letter)
-        guessed_letters = self.guessed_letters
-        letter_button = game.get_letter_button(letter)
+        self.animation_start_time = game_clock.now() + self.animation_start_delay
+        game.schedule_update(self)
 
-        if letter not in correct_answer:
-            game.heart_object.remove_health(1)
-            letter_button.change_button_state(BUTTON_PRESSED_INCORRECT)
+    def show_guess(self, letter: str, result): # a guess the rules have already applied to the round
+        self.previous_letter_guessed = letter.upper()
+        if result == GUESS_WRONG:
             self.wrong_letter_animation()
-            if game.heart_object.get_health() <= 0:
-                game.game_lost()
-            return
-        
-        self.correct_letter_animation()
-        letter_button.change_button_state(BUTTON_PRESSED_CORRECT)
-    
-        for letter in correct_answer:
-            if letter not in guessed_letters and letter in string.ascii_uppercase:
-                guessed_string += '_'
-            else:
-                guessed_string += letter
-
-        self.draw_text = guessed_string
-
-        if guessed_string == correct_answer:
-            game.game_won()
-            
-        self._update_surface()
+        elif result != GUESS_IGNORED:
+            self.correct_letter_animation()
+            self.draw_text = self.round.revealed_text()
+            self._update_surface()
 
 class ButtonObject(GameObject):
+    press_frame_cache: Dict[tuple, List[pygame.Surface]] = {} # press animation frames per base surface, shared by all buttons
+    __slots__ = ('button_function', 'button_state', 'previous_state', 'is_animating', 'animate_center', 'animate_step',
+                 'animate_time', 'press_tween', 'max_animate_steps', 'surface_min_scale')
+
     def __init__(self, id) -> None:
         super().__init__(id)
         self.object_type = BUTTON_OBJECT_TYPE
@@ -613,8 +783,9 @@ class ButtonObject(GameObject):
         self.is_animating = False
         self.animate_center = None
         self.animate_step = 0
-        self.animate_time = 50
-        self.max_animate_steps = 60 * (self.animate_time / 1000)
+        self.animate_time = 50 # milliseconds
+        self.press_tween = Tween(self.animate_time)
+        self.max_animate_steps = 3 # prerendered scales after the full size one, spread over animate_time
         self.surface_min_scale = 0.9
 
     def activate(self):
@@ -624,6 +795,9 @@ class ButtonObject(GameObject):
         if self.is_animating:
             self._update_surface()
             pressed_animation(self)
+
+    def next_deadline(self):
+        return game_clock.now() if self.is_animating else None
     
     def draw(self, screen):
         if self.surface is not None and self.rect is not None:
@@ -632,8 +806,32 @@ class ButtonObject(GameObject):
     def _update_surface(self):
         raise NotImplementedError
 
+    def get_press_frames(self):
+        base_surface = self.surface
+        key = (base_surface, base_surface.get_size(), base_surface.get_alpha(), self.max_animate_steps, self.surface_min_scale)
+        frames = ButtonObject.press_frame_cache.get(key)
+        if frames is None:
+            scale_amount = (1 - self.surface_min_scale) / self.max_animate_steps
+            frames = []
+            for step in range(int(self.max_animate_steps) + 1):
+                frame = pygame.transform.smoothscale_by(base_surface, 1 - scale_amount * step)
+                frame.set_alpha(base_surface.get_alpha())
+                frames.append(frame)
+            ButtonObject.press_frame_cache[key] = frames
+        return frames
+
+    @classmethod
+    def clear_press_frames(cls, surface: pygame.Surface = None): # needed only if a base surface is drawn on after its frames were made
+        if surface is None:
+            cls.press_frame_cache.clear()
+            return
+        for key in [key for key in cls.press_frame_cache if key[0] is surface]:
+            del cls.press_frame_cache[key]
+
 
 class MenuButton(ButtonObject):
+    __slots__ = ('button_menu_pointer', 'button_pressed_timer', 'button_pressed_last_tick', 'image_list')
+
     def __init__(self, id, surface_pressed: pygame.Surface, surface_unpressed: pygame.Surface, rect, button_function, button_menu_pointer = None) -> None:
         super().__init__(id)
         self.rect = rect
@@ -649,12 +847,17 @@ class MenuButton(ButtonObject):
 
     def update(self):
         if self.button_state == BUTTON_PRESSED:
-            ticks = pygame.time.get_ticks() - self.button_pressed_last_tick
+            ticks = game_clock.now() - self.button_pressed_last_tick
             if ticks >= self.button_pressed_timer:
                 self.button_state = BUTTON_UNPRESSED
                 self._update_surface()
         super().update()
 
+    def next_deadline(self):
+        if self.button_state == BUTTON_PRESSED and not self.is_animating:
+            return self.button_pressed_last_tick + self.button_pressed_timer
+        return super().next_deadline()
+
     def activate(self):
         if self.button_menu_pointer:
             self.button_function(self.button_menu_pointer)
@@ -663,8 +866,10 @@ class MenuButton(ButtonObject):
         self.button_state = BUTTON_PRESSED
         self.is_animating = True
         self.animate_step = 0
-        self.button_pressed_last_tick = pygame.time.get_ticks()
+        self.press_tween.start()
+        self.button_pressed_last_tick = game_clock.now()
         self._update_surface()
+        game.schedule_update(self)
         
     def _update_surface(self):
         self.surface = self.image_list[self.button_state]
@@ -672,27 +877,22 @@ class MenuButton(ButtonObject):
     def change_button_state(self, state_number): # 0 for unpressed state, 1 for correct pressed, 2 for incorrect pressed
         self.button_state = state_number
 
-    def draw(self, screen: pygame.Surface):
-        if self.id == NEXT_BUTTON_ID and game.game_ended != GAME_WON:
-            return
-        if self.id == TRY_AGAIN_BUTTON_ID and game.game_ended != GAME_LOST:
-            return
-        super().draw(screen)
-
 class LetterButton(ButtonObject):
+    __slots__ = ('image_list', 'background_image', 'letter', 'font', 'color', 'letter_surface', 'pressed_alpha')
+
     def __init__(self, id, letter, font: Font) -> None:
         super().__init__(id)
         self.object_type = BUTTON_OBJECT_TYPE
         self.image_list = {
-            BUTTON_UNPRESSED: letter_button_unpressed_scaled.copy(),
-            BUTTON_PRESSED_CORRECT: letter_button_pressed_correct_scaled.copy(),
-            BUTTON_PRESSED_INCORRECT: letter_button_pressed_incorrect_scaled.copy()
+            BUTTON_UNPRESSED: assets['letter_button_unpressed_scaled'].copy(),
+            BUTTON_PRESSED_CORRECT: assets['letter_button_pressed_correct_scaled'].copy(),
+            BUTTON_PRESSED_INCORRECT: assets['letter_button_pressed_incorrect_scaled'].copy()
             }
         self.background_image = self.image_list[self.button_state]
         self.letter: str = letter
         self.font = font
         self.color = LETTER_BUTTON_COLOR
-        self.letter_surface = font.render(letter, True, self.color)
+        self.letter_surface = glyph_atlas.get(font, letter, self.color)
         self.rect = self.background_image.get_rect()
         self.surface = None
         self.pressed_alpha = {
@@ -700,6 +900,11 @@ class LetterButton(ButtonObject):
             BUTTON_PRESSED_CORRECT: 150,
             BUTTON_PRESSED_INCORRECT: 100
         }
+        for state, image in self.image_list.items(): # letter is drawn on each state image once
+            letter_surface_rect = self.letter_surface.get_rect()
+            letter_surface_rect.center = image.get_rect().center
+            image.blit(self.letter_surface, letter_surface_rect)
+            image.set_alpha(self.pressed_alpha[state])
 
         self._update_surface()
 
@@ -707,22 +912,27 @@ class LetterButton(ButtonObject):
         self.button_state = state_number
         self.is_animating = True
         self.animate_step = 0
+        self.press_tween.start()
         self._update_surface()
+        game.schedule_update(self)
+
+    def reset_button(self): # back to unpressed without the press animation
+        self.button_state = BUTTON_UNPRESSED
+        self.is_animating = False
+        self.animate_step = 0
+        self._update_surface()
+        self.rect = self.surface.get_rect(center=self.rect.center)
 
     def _update_surface(self):
         self.background_image = self.image_list[self.button_state]
-        letter_surface_rect = self.letter_surface.get_rect()
-        background_image_center = self.background_image.get_rect().center
-        letter_surface_rect.center = (background_image_center[0], background_image_center[1])
         self.surface = self.background_image
 
-        self.surface.blit(self.letter_surface, letter_surface_rect)
-        self.surface.set_alpha(self.pressed_alpha[self.button_state])
-
     def activate(self):
-        game.answer_object.check_letter(self.letter)
+        game.guess_letter(self.letter)
 
 class ScoreObject(TextObject):
+    __slots__ = ('streak', 'text_template')
+
     def __init__(self, id, font: Font, color=None) -> None:
         super().__init__(id, font, color)
         self.streak = 0
@@ -736,18 +946,36 @@ class ScoreObject(TextObject):
         self.streak += 1
         self.set_text(f"{difficulty_name.upper()}" + self.text_template + str(self.streak))
 
-def pressed_animation(self: ButtonObject):
-    scale_amount = (1 - self.surface_min_scale) / self.max_animate_steps
-    self.surface = pygame.transform.smoothscale_by(self.surface, 1 - scale_amount * self.animate_step)
+class HintObject(TextObject):
+    __slots__ = ('text_template',)
+
+    def __init__(self, id, font: Font, color=None) -> None:
+        super().__init__(id, font, color)
+        self.text_template = "HINT: "
+        self.set_text('')
+
+    def show_hint(self, letter: str): # None when no word of the wordlist fits the answer
+        self.set_text(self.text_template + (letter or "?"))
+
+    def show_loading(self):
+        self.set_text(self.text_template + "...")
+
+    def clear_hint(self):
+        if self.text:
+            self.set_text('')
+
+def pressed_animation(self: ButtonObject): # expects self.surface to be the base surface of the current state
+    frames = self.get_press_frames()
     temp_center = self.rect.center
-    self.rect = self.surface.get_rect()
-    self.rect.center = temp_center
-    self.animate_step += 1
-    if self.animate_step > self.max_animate_steps:
+    if self.press_tween.is_finished():
+        self.animate_step = self.max_animate_steps + 1
         self.is_animating = False
         self._update_surface()
-        self.rect = self.surface.get_rect()
-        self.rect.center = temp_center
+    else:
+        self.animate_step = int(self.press_tween.progress() * len(frames))
+        self.surface = frames[min(self.animate_step, len(frames) - 1)]
+    self.rect = self.surface.get_rect()
+    self.rect.center = temp_center
 
 def create_keyboard_zone(screen_size):
     screen_size_x, screen_size_y = screen_size
@@ -773,17 +1001,11 @@ def create_keyboard_zone(screen_size):
 
     return keyboard_rect
 
-def read_wordlist(file_name):
-    wordlist = []
-    with open(file_name, "r") as openfile:
-        for line in openfile:
-            word = line.rstrip()
-            wordlist.append(word)
-
-    return wordlist
-
 def menu_action(event, game_state):
     event_key = event.key
+    if event_key == HINT_KEY and game_state == PLAY_MENU:
+        game.show_hint()
+        return True
     if event_key == pygame.K_ESCAPE: # Like back button
         if game_state == PLAY_MENU or game_state == SCORE_MENU:
             back_button.activate()
@@ -802,62 +1024,238 @@ def menu_action(event, game_state):
     return False
 
 
-async def main():
+def handle_events(events): # returns False when the game should quit
+    running = True
+    for event in events:
 
-    game.unfreeze_input()
+        if event.type == pygame.QUIT:
+            running = False
 
-    running = 1
+        if game.input_frozen: # inputs frozen during transition
+            continue
 
-    while running:
-        events = pygame.event.get()
-        for event in events:
-
-            if event.type == pygame.QUIT:
-                running = 0
-
-            if game.input_frozen: # inputs frozen during transition
-                continue
-
-
-            elif event.type == pygame.KEYDOWN:
-                if not menu_action(event, game.current_menu):
-                    event_key = event.key
-                    if game.current_menu == PLAY_MENU:
-                        try:
-                            key_upper = chr(event_key).upper()
-                            letter_button = game.get_letter_button(key_upper)
-                            if letter_button is not None:
-                                letter_button.activate()
-                        except:
-                            pass
-
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    mousepos = pygame.mouse.get_pos()
-                    list_of_objects = game.get_objects(BUTTON_OBJECT_TYPE)
-                    if list_of_objects is not None:
-                        for object in list_of_objects:
-                            if object.rect.collidepoint(mousepos):
-                                object.activate()
 
-        screen.fill(BACKGROUND_COLOR)
+        elif event.type == pygame.KEYDOWN:
+            if not menu_action(event, game.current_menu):
+                event_key = event.key
+                if game.current_menu == PLAY_MENU:
+                    letter_button = game.get_letter_button_for_key(event_key)
+                    if letter_button is not None:
+                        letter_button.activate()
 
-        score_menu_effects.update()
-        score_menu_effects.draw(screen)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                button = game.get_button_at(event.pos)
+                if button is not None:
+                    button.activate()
+
+    return running
 
+def run_frame(renderer: DirtyRectRenderer = None, profiler: FrameProfiler = None):
+    # Runs the clock steps due since the last frame, then draws once. A slow frame runs more steps
+    # instead of slowing the game, a fast one may run none and only draw.
+    game.build_ready_menus()
+    if profiler is not None:
+        profiler.mark(MENU_BUILD_PHASE)
+    for _ in range(game_clock.advance()):
+        game_clock.step()
+        score_menu_effects.update()
+        if profiler is not None:
+            profiler.mark(EFFECTS_UPDATE_PHASE)
         game.update()
+        if profiler is not None:
+            profiler.mark(GAME_UPDATE_PHASE)
+    if renderer is not None:
+        renderer.render(screen, score_menu_effects)
+        if profiler is not None:
+            profiler.mark(GAME_DRAW_PHASE) # the renderer draws and pushes the frame in one go
+    else:
+        screen.fill(BACKGROUND_COLOR)
+        if profiler is not None:
+            profiler.mark(GAME_DRAW_PHASE)
+        score_menu_effects.draw(screen)
+        if profiler is not None:
+            profiler.mark(EFFECTS_DRAW_PHASE)
         game.draw(screen)
+        if profiler is not None:
+            profiler.mark(GAME_DRAW_PHASE)
 
         pygame.display.flip()
+        if profiler is not None:
+            profiler.mark(DISPLAY_PHASE)
+
+def build_play_menu():
+    global back_button
+    game.set_heart_object(HeartObject(HEART_ID, assets['heart_full_scaled'], assets['heart_half_scaled'], assets['heart_empty_scaled']))
+    game.create_letter_buttons()
+
+    back_button_unpressed_scaled = assets['back_button_unpressed_scaled']
+    back_button_scaled_rect = back_button_unpressed_scaled.get_rect()
+    back_button_function = game.go_to_menu
+    back_button_menu_pointer = START_MENU
+    back_button = MenuButton(BACK_BUTTON_ID, assets['back_button_pressed_scaled'], back_button_unpressed_scaled, back_button_scaled_rect, back_button_function, back_button_menu_pointer)
+
+    game_logo_no_text_scaled = assets['game_logo_no_text_scaled']
+    game_logo_no_text_scaled.set_alpha(10)
+    game_logo_no_text_object = ImageObject(LOGO_BACKGROUND_ID, game_logo_no_text_scaled)
+
+    game.add_object(PLAY_MENU, logo_game_button)
+    game.add_object(PLAY_MENU, back_button)
+    game.add_object(PLAY_MENU, game_logo_no_text_object)
+    game.add_object(PLAY_MENU, hint_object)
+
+def build_score_menu(): # the back button comes from the play menu, which is always built first
+    global next_button, try_again_button
+    next_button_unpressed_scaled = assets['next_button_unpressed_scaled']
+    next_button_scaled_rect = next_button_unpressed_scaled.get_rect()
+    next_button_function = game.go_to_menu
+    next_button_menu_pointer = PLAY_MENU
+    next_button = MenuButton(NEXT_BUTTON_ID, assets['next_button_pressed_scaled'], next_button_unpressed_scaled, next_button_scaled_rect, next_button_function, next_button_menu_pointer)
+
+    try_again_button_unpressed_scaled = assets['try_again_button_unpressed_scaled']
+    try_again_button_scaled_rect = try_again_button_unpressed_scaled.get_rect()
+    try_again_button_function = game.go_to_menu
+    try_again_button_menu_pointer = PLAY_MENU
+    try_again_button = MenuButton(TRY_AGAIN_BUTTON_ID, assets['try_again_button_pressed_scaled'], try_again_button_unpressed_scaled, try_again_button_scaled_rect, try_again_button_function, try_again_button_menu_pointer)
+
+    game_over_object = ImageObject(GAME_OVER_ID, assets['game_over_text_scaled'])
+    you_win_object = ImageObject(YOU_WIN_ID, assets['you_win_text_scaled'])
+
+    game.add_object(SCORE_MENU, next_button, visible_when=game.is_won)
+    game.add_object(SCORE_MENU, try_again_button, visible_when=game.is_lost)
+    game.add_object(SCORE_MENU, game_over_object, visible_when=game.is_lost)
+    game.add_object(SCORE_MENU, you_win_object, visible_when=game.is_won)
+    game.add_object(SCORE_MENU, back_button)
+
+def create_profiler():
+    transition_names = {NO_TRANSITION: 'no_transition', TRANSITION_IN: 'transition_in', TRANSITION_OUT: 'transition_out', SCORE_SCREEN_DELAY: 'score_screen_delay'}
+    return FrameProfiler(transition_names=transition_names)
+
+def next_deadline(): # game time the next update is needed at, None when nothing is animating or waiting on a timer
+    deadlines = [deadline for deadline in (game.next_deadline(), score_menu_effects.next_deadline()) if deadline is not None]
+    return min(deadlines) if deadlines else None
+
+def wait_for_input(deadline): # sleeps until an event arrives or the deadline passes, returns the event that woke it
+    if deadline is None:
+        event = pygame.event.wait()
+    else:
+        event = pygame.event.wait(max(int(deadline - game_clock.now()), 1))
+    return [] if event.type == pygame.NOEVENT else [event]
+
+def session_summary(session_log: SessionLog): # what a replay has to reproduce
+    return {
+        'frames': game_clock.frames,
+        'steps': game_clock.steps,
+        'words': session_log.words,
+        'guesses': session_log.guesses,
+        'streak': score_object.streak,
+        'particle_checksum': session_log.particle_checksum,
+    }
+
+async def main():
+
+    game.unfreeze_input()
+
+    renderer = DirtyRectRenderer(game, BACKGROUND_COLOR) if DIRTY_RECT_RENDERING else None
+
+    profiler = create_profiler() if PROFILE_FILE else None
+
+    session_log = SessionLog(game.round) if input_recorder is not None or input_replay is not None else None
+    frame_times = []
+    woken_events = [] # event that ended an idle wait, handled with the next frame's events
+
+    running = 1
+
+    while running:
+        if input_replay is not None:
+            if input_replay.is_finished():
+                break
+            frame_start = time.perf_counter()
+        if profiler is not None:
+            profiler.begin_frame(game.current_menu, game.menu_transitioning_state)
+
+        if input_replay is not None:
+            pygame.event.pump() # live input is ignored, the window stays responsive
+            events = input_replay.next_events()
+        else:
+            events = woken_events + pygame.event.get()
+            woken_events = []
+            if renderer is not None and any(event.type == pygame.WINDOWEXPOSED for event in events):
+                renderer.invalidate()
+            if input_recorder is not None:
+                input_recorder.record_events(events)
+        running = handle_events(events)
+        if profiler is not None:
+            profiler.mark(EVENTS_PHASE)
+            if any(event.type == pygame.KEYDOWN and event.key == PROFILE_DUMP_KEY for event in events):
+                profiler.dump(PROFILE_FILE)
+
+        run_frame(renderer, profiler)
+        if session_log is not None:
+            session_log.observe(game.round, fireworks.position_sum())
     
-        clock.tick(TICK_SPEED)
+        # Nothing animating: sleep until input or the next timer instead of drawing unchanged frames.
+        # Replays make the same decision and skip the same clock time, without the sleep.
+        deadline = next_deadline() if IDLE_PACING and running else game_clock.now()
+        if deadline is None or deadline > game_clock.now() + game_clock.step_time:
+            if input_replay is None:
+                woken_events = wait_for_input(deadline)
+            game_clock.skip_idle()
+        elif input_replay is None: # replays run at full speed
+            clock.tick(TICK_SPEED)
+        if profiler is not None:
+            profiler.mark(TICK_PHASE)
+            profiler.end_frame()
+        if input_replay is not None:
+            frame_times.append((time.perf_counter() - frame_start) * 1000)
         
         await asyncio.sleep(0)
 
+    if profiler is not None:
+        profiler.dump(PROFILE_FILE)
+    if input_recorder is not None:
+        input_recorder.save(args.record, session_summary(session_log))
+    if input_replay is not None:
+        from benchmark import frame_time_summary, write_results
+        summary = session_summary(session_log)
+        differences = compare_summaries(input_replay.summary, summary)
+        write_results({'replay': args.replay, 'frame_times': frame_time_summary(frame_times), 'session': summary, 'matches_recording': not differences, 'differences': differences}, args.output)
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play TagMan")
+    parser.add_argument('--dirty-rects', action='store_true', help="repaint only changed areas of the screen")
+    parser.add_argument('--benchmark', action='store_true', help="play scripted sessions headless and print frame times as json")
+    parser.add_argument('--frames', type=int, default=600, help="frames per benchmark scenario")
+    parser.add_argument('--output', help="write benchmark results to this file instead of stdout")
+    parser.add_argument('--wordlist', default="wordlist.txt", help="text wordlist, or a word store compiled with wordstore.py")
+    parser.add_argument('--fps', type=int, default=60, help="frame rate cap, 0 draws as fast as possible. Game speed is the same at any rate")
+    parser.add_argument('--no-idle', action='store_true', help="keep drawing at full frame rate when nothing animates")
+    parser.add_argument('--record', help="save the seeds, frame clock readings and input of this session to a file for --replay")
+    parser.add_argument('--replay', help="play a recorded session again at full speed and print frame times as json")
+    parser.add_argument('--profile', nargs='?', const='frame_profile', help="record per phase frame times, written to PROFILE.csv/.json on exit or F9")
+    args, _ = parser.parse_known_args()
+
+    DIRTY_RECT_RENDERING = args.dirty_rects
+    PROFILE_FILE = args.profile
+    PROFILE_DUMP_KEY = pygame.K_F9
+    IDLE_PACING = not args.no_idle and sys.platform != "emscripten" # browsers can't block in event.wait
+    HINT_KEY = pygame.K_TAB
+
+    if args.benchmark: # no window, no audio
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+    input_replay = InputReplay(args.replay) if args.replay else None
+    input_recorder = None
+    if input_replay is not None:
+        args.wordlist = input_replay.wordlist
+        seeds = input_replay.seeds
+    elif args.record:
+        seeds = new_seeds()
+
     pygame.init()
     
-    screen_size_x, screen_size_y = (1024, 768)
+    screen_size_x, screen_size_y = input_replay.screen_size if input_replay is not None else (1024, 768)
 
     screen = pygame.display.set_mode((screen_size_x, screen_size_y), pygame.DOUBLEBUF | pygame.SCALED)
 
@@ -865,8 +1263,16 @@ if __name__ == "__main__":
 
     pygame.display.set_caption(f"Play {game_name}")
 
-    IMAGE_FOLDER = 'images'
-    icon_image = pygame.image.load("favicon.png").convert()
+    # Images each menu needs before it can be built, the loader works through them in this order
+    START_MENU_ASSETS = ['icon_image', 'main_menu_logo_scaled', 'game_menu_logo_scaled',
+                         'start_easy_game_unpressed_scaled', 'start_easy_game_pressed_scaled', 'start_hard_game_unpressed_scaled', 'start_hard_game_pressed_scaled']
+    PLAY_MENU_ASSETS = ['game_logo_no_text_scaled', 'heart_full_scaled', 'heart_half_scaled', 'heart_empty_scaled', 'back_button_unpressed_scaled', 'back_button_pressed_scaled',
+                        'letter_button_unpressed_scaled', 'letter_button_pressed_incorrect_scaled', 'letter_button_pressed_correct_scaled']
+    SCORE_MENU_ASSETS = ['game_over_text_scaled', 'you_win_text_scaled', 'next_button_unpressed_scaled', 'next_button_pressed_scaled', 'try_again_button_unpressed_scaled', 'try_again_button_pressed_scaled']
+
+    assets = AssetLoader((screen_size_x, screen_size_y), START_MENU_ASSETS + PLAY_MENU_ASSETS + SCORE_MENU_ASSETS)
+
+    icon_image = assets['icon_image']
     pygame.display.set_icon(icon_image)
 
     # Game states
@@ -914,96 +1320,29 @@ if __name__ == "__main__":
     ANSWER_FONT.set_bold(True)
     SCORE_FONT = Font(RUBIKMONO_FONT, SCORE_FONT_SIZE)
 
-    game_logo_no_text = pygame.image.load(os.path.join(IMAGE_FOLDER, "game_logo_no_text.png")).convert_alpha()
-    scale_amount = (screen_size_x / 1.6) / game_logo_no_text.get_size()[0]
-    game_logo_no_text_scaled = pygame.transform.smoothscale_by(game_logo_no_text, scale_amount)
-
-    game_logo = pygame.image.load(os.path.join(IMAGE_FOLDER, "game_logo.png")).convert_alpha()
-    main_menu_logo_scaled = pygame.transform.smoothscale_by(game_logo, 0.5)
-
-    oprimagazine_logo_smallest = pygame.image.load(os.path.join(IMAGE_FOLDER, "logo_y_100.png")).convert_alpha()
-    logo_y_size = oprimagazine_logo_smallest.get_size()[1]
-    game_menu_y_size = 100
-    game_menu_scale = 1 / (logo_y_size / game_menu_y_size)
-    game_menu_logo_scaled = pygame.transform.smoothscale_by(oprimagazine_logo_smallest, game_menu_scale)
-    
-    score_screen_text_scale = 0.7
-
-    game_over_text = pygame.image.load(os.path.join(IMAGE_FOLDER, "game_over_text.png")).convert_alpha()
-    game_over_text_scaled = pygame.transform.smoothscale_by(game_over_text, score_screen_text_scale)
+    glyph_atlas = GlyphAtlas()
 
-    you_win_text = pygame.image.load(os.path.join(IMAGE_FOLDER, "you_win_text.png")).convert_alpha()
-    you_win_text_scaled = pygame.transform.smoothscale_by(you_win_text, score_screen_text_scale)
+    main_menu_logo_scaled = assets['main_menu_logo_scaled']
+    game_menu_logo_scaled = assets['game_menu_logo_scaled']
     
     HEART_FULL = 2
     HEART_HALF = 1
     HEART_EMPTY = 0
 
-    heart_size = (50, 50)
-    heart_full = pygame.image.load(os.path.join(IMAGE_FOLDER, "full_heart.png")).convert_alpha()
-    heart_full_scaled = pygame.transform.smoothscale(heart_full, heart_size)
-    heart_half = pygame.image.load(os.path.join(IMAGE_FOLDER, "half_heart.png")).convert_alpha()
-    heart_half_scaled = pygame.transform.smoothscale(heart_half, heart_size)
-    heart_empty = pygame.image.load(os.path.join(IMAGE_FOLDER, "empty_heart.png")).convert_alpha()
-    heart_empty_scaled = pygame.transform.smoothscale(heart_empty, heart_size)
-    
-    start_easy_game_unpressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "easy_button_unpressed.png")).convert_alpha()
-    start_easy_button_size = start_easy_game_unpressed.get_size()
-    start_easy_button_scale = 5
-    start_easy_game_unpressed_scaled = pygame.transform.smoothscale(start_easy_game_unpressed, (int(start_easy_button_size[0] / start_easy_button_scale), int(start_easy_button_size[1] / start_easy_button_scale)))
-    start_easy_game_pressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "easy_button_pressed.png")).convert_alpha()
-    start_easy_game_pressed_scaled = pygame.transform.smoothscale(start_easy_game_pressed, (int(start_easy_button_size[0] / start_easy_button_scale), int(start_easy_button_size[1] / start_easy_button_scale)))
-
-    start_hard_game_unpressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "hard_button_unpressed.png")).convert_alpha()
-    start_hard_button_size = start_hard_game_unpressed.get_size()
-    start_hard_button_scale = 5
-    start_hard_game_unpressed_scaled = pygame.transform.smoothscale(start_hard_game_unpressed, (int(start_hard_button_size[0] / start_hard_button_scale), int(start_hard_button_size[1] / start_hard_button_scale)))
-    start_hard_game_pressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "hard_button_pressed.png")).convert_alpha()
-    start_hard_game_pressed_scaled = pygame.transform.smoothscale(start_hard_game_pressed, (int(start_hard_button_size[0] / start_hard_button_scale), int(start_hard_button_size[1] / start_hard_button_scale)))
-
-    back_button_unpressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "x_back_button_unpressed.png")).convert_alpha()
-    back_button_size = back_button_unpressed.get_size()
-    back_button_scale = 8
-    back_button_unpressed_scaled = pygame.transform.smoothscale(back_button_unpressed, (int(back_button_size[0] / back_button_scale), int(back_button_size[1] / back_button_scale)))
-    back_button_pressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "x_back_button_pressed.png")).convert_alpha()
-    back_button_pressed_scaled = pygame.transform.smoothscale(back_button_pressed, (int(back_button_size[0] / back_button_scale), int(back_button_size[1] / back_button_scale)))
-
-    next_button_unpressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "next_button_unpressed.png")).convert_alpha()
-    next_button_size = next_button_unpressed.get_size()
-    next_button_scale = 1 / (start_easy_game_unpressed_scaled.get_size()[1] / next_button_size[1])
-    next_button_unpressed_scaled = pygame.transform.smoothscale(next_button_unpressed, (int(next_button_size[0] / next_button_scale), int(next_button_size[1] / next_button_scale)))
-
-    next_button_pressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "next_button_pressed.png")).convert_alpha()
-    next_button_pressed_scaled = pygame.transform.smoothscale(next_button_pressed, (int(next_button_size[0] / next_button_scale), int(next_button_size[1] / next_button_scale)))
-
-    try_again_button_unpressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "try_again_button_unpressed.png")).convert_alpha()
-    try_again_button_size = try_again_button_unpressed.get_size()
-    try_again_button_scale = 1 / (start_easy_game_unpressed_scaled.get_size()[1] / try_again_button_size[1])
-    try_again_button_unpressed_scaled = pygame.transform.smoothscale(try_again_button_unpressed, (int(try_again_button_size[0] / try_again_button_scale), int(try_again_button_size[1] / try_again_button_scale)))
-    
-    try_again_button_pressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "try_again_button_pressed.png")).convert_alpha()
-    try_again_button_pressed_scaled = pygame.transform.smoothscale(try_again_button_pressed, (int(try_again_button_size[0] / try_again_button_scale), int(try_again_button_size[1] / try_again_button_scale)))
-
-    letter_button_size = LETTER_BUTTON_FONT_SIZE * 2
+    start_easy_game_unpressed_scaled = assets['start_easy_game_unpressed_scaled']
+    start_easy_game_pressed_scaled = assets['start_easy_game_pressed_scaled']
+    start_hard_game_unpressed_scaled = assets['start_hard_game_unpressed_scaled']
+    start_hard_game_pressed_scaled = assets['start_hard_game_pressed_scaled']
 
     BUTTON_UNPRESSED = 0
     BUTTON_PRESSED_CORRECT = 1 # for letter buttons
     BUTTON_PRESSED_INCORRECT = 2 # for letter buttons
     BUTTON_PRESSED = 3
 
-    letter_button_unpressed = pygame.image.load(os.path.join(IMAGE_FOLDER, "letter_button_unpressed.png")).convert_alpha()
-    letter_button_unpressed_scaled = pygame.transform.smoothscale(letter_button_unpressed, (letter_button_size, letter_button_size))
-
-    letter_button_pressed_incorrect = pygame.image.load(os.path.join(IMAGE_FOLDER, "letter_button_pressed_incorrect.png")).convert_alpha()
-    letter_button_pressed_incorrect_scaled = pygame.transform.smoothscale(letter_button_pressed_incorrect, (letter_button_size, letter_button_size))
-
-    letter_button_pressed_correct = pygame.image.load(os.path.join(IMAGE_FOLDER, "letter_button_pressed_correct.png")).convert_alpha()
-    letter_button_pressed_correct_scaled = pygame.transform.smoothscale(letter_button_pressed_correct, (letter_button_size, letter_button_size))
-
+    wordlist_file = args.wordlist
+    WORD_SCHEDULE_FILE = None if args.benchmark else "word_schedule.json" # word order survives restarts
 
-    wordlist_file = "wordlist.txt"
-
-    TICK_SPEED = 60
+    TICK_SPEED = args.fps # clock.tick(0) doesn't wait
     clock = pygame.time.Clock()
     
     PAUSE_AFTER_WIN_TIMER = pygame.USEREVENT + 1
@@ -1020,23 +1359,20 @@ if __name__ == "__main__":
     CORRECT_LETTER_ANIMATION = 0
     WRONG_LETTER_ANIMATION = 1
 
-    NOT_ENDED = -1
-    GAME_LOST = 0
-    GAME_WON = 1
+    NOT_ENDED = ROUND_IN_PROGRESS
+    GAME_LOST = ROUND_LOST
+    GAME_WON = ROUND_WON
 
     HEART_ID = 'heart'
     ANSWER_ID = 'answer'
     SCORE_ID = 'score'
+    HINT_ID = 'hint'
 
     answer_object = AnswerObject(ANSWER_ID, ANSWER_FONT, ANSWER_FONT_COLOR)
     score_object = ScoreObject(SCORE_ID, SCORE_FONT, SCORE_FONT_COLOR)
+    hint_object = HintObject(HINT_ID, LETTER_BUTTON_FONT, MAIN_GREY_COLOR)
 
-    heart_object = HeartObject(HEART_ID, heart_full_scaled, heart_half_scaled, heart_empty_scaled)
-
-    EASY_MODE = "easy"
-    HARD_MODE = "hard"
-
-    game = Game(screen, answer_object, heart_object, score_object)
+    game = Game(screen, answer_object, score_object)
 
     START_EASY_BUTTON_ID = 'start_easy_button'
     START_HARD_BUTTON_ID = 'start_hard_button'
@@ -1059,61 +1395,53 @@ if __name__ == "__main__":
     start_hard_button_function = game.start_hard_game
     start_hard_button = MenuButton(START_HARD_BUTTON_ID, start_hard_game_pressed_scaled, start_hard_game_unpressed_scaled, start_hard_game_scaled_rect, start_hard_button_function)
     
-    back_button_scaled_rect = back_button_unpressed_scaled.get_rect()
-    back_button_function = game.go_to_menu
-    back_button_menu_pointer = START_MENU
-    back_button = MenuButton(BACK_BUTTON_ID, back_button_pressed_scaled, back_button_unpressed_scaled, back_button_scaled_rect, back_button_function, back_button_menu_pointer)
-    
-    next_button_scaled_rect = next_button_unpressed_scaled.get_rect()
-    next_button_function = game.go_to_menu
-    next_button_menu_pointer = PLAY_MENU
-    next_button = MenuButton(NEXT_BUTTON_ID, next_button_pressed_scaled, next_button_unpressed_scaled, next_button_scaled_rect, next_button_function, next_button_menu_pointer)
-    
-    try_again_button_scaled_rect = try_again_button_unpressed_scaled.get_rect()
-    try_again_button_function = game.go_to_menu
-    try_again_button_menu_pointer = PLAY_MENU
-    try_again_button = MenuButton(TRY_AGAIN_BUTTON_ID, try_again_button_pressed_scaled, try_again_button_unpressed_scaled, try_again_button_scaled_rect, try_again_button_function, try_again_button_menu_pointer)
-
     logo_main_image = ImageObject(LOGO_MAIN_ID, main_menu_logo_scaled)
     
     logo_game_button_scaled_rect = game_menu_logo_scaled.get_rect()
     logo_game_button_function = game.go_to_website
     logo_game_button_menu_pointer = r"https://www.oprimagazine.com/"
     logo_game_button = MenuButton(LOGO_GAME_ID, game_menu_logo_scaled, game_menu_logo_scaled, logo_game_button_scaled_rect, logo_game_button_function, logo_game_button_menu_pointer)
-    
-    game_logo_no_text_scaled.set_alpha(10)
-    game_logo_no_text_object = ImageObject(LOGO_BACKGROUND_ID, game_logo_no_text_scaled)
-
-    game_over_object = ImageObject(GAME_OVER_ID, game_over_text_scaled)
-    you_win_object = ImageObject(YOU_WIN_ID, you_win_text_scaled)
-
 
     game.add_object(START_MENU, start_easy_button)
     game.add_object(START_MENU, start_hard_button)
     game.add_object(START_MENU, logo_main_image)
     game.add_object(START_MENU, logo_game_button)
 
-    game.add_object(PLAY_MENU, logo_game_button)
-    game.add_object(PLAY_MENU, back_button)
-    game.add_object(PLAY_MENU, game_logo_no_text_object)
-
-    game.add_object(SCORE_MENU, next_button)
-    game.add_object(SCORE_MENU, try_again_button)
-    game.add_object(SCORE_MENU, game_over_object)
-    game.add_object(SCORE_MENU, you_win_object)
-    game.add_object(SCORE_MENU, back_button)
+    # Play and score menus are built once their images have loaded, or when the game goes to them first
+    game.add_menu_builder(PLAY_MENU, PLAY_MENU_ASSETS, build_play_menu)
+    game.add_menu_builder(SCORE_MENU, SCORE_MENU_ASSETS, build_score_menu)
 
     game.reposition_objects((screen_size_x, screen_size_y))
 
     score_menu_effects = EffectController()
-    score_menu_effects.add_effect(Fireworks(screen))
+    fireworks = Fireworks(screen)
+    score_menu_effects.add_effect(fireworks)
+
+    if args.record or input_replay is not None: # every random subsystem gets its own seed, the clock reads the recording
+        game.seed(seeds['game'], seeds['words'])
+        fireworks.seed(seeds['fireworks'], seeds['explosion'])
+        if input_replay is not None:
+            game_clock.time_source = input_replay.time_source
+        else:
+            input_recorder = InputRecorder(seeds, (screen_size_x, screen_size_y), args.wordlist)
+            game_clock.time_source = input_recorder.time_source
+        game.build_menu(SCORE_MENU) # menus don't depend on how fast images load
 
     pygame.event.set_allowed([
         pygame.MOUSEBUTTONDOWN,
         pygame.MOUSEBUTTONUP,
         pygame.KEYDOWN,
         pygame.KEYUP,
+        pygame.WINDOWEXPOSED,
         pygame.QUIT]
         )
 
-    asyncio.run(main())
\ No newline at end of file
+    if args.benchmark:
+        from benchmark import benchmark_game, write_results
+        profiler = create_profiler() if PROFILE_FILE else None
+        game.build_menu(SCORE_MENU) # load everything up front so no scenario waits for assets
+        write_results(benchmark_game(sys.modules[__name__], args.frames, profiler=profiler), args.output)
+        if profiler is not None:
+            profiler.dump(PROFILE_FILE)
+    else:
+        asyncio.run(main())
\ No newline at end of file
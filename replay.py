@@ -0,0 +1,117 @@
+from __future__ import annotations
+import json
+import time
+import random
+from typing import Dict, List
+import pygame
+
+# A recording holds everything a session depends on besides the code: the seed of every random subsystem,
+# the clock reading of every frame and the input events with the frame they arrived in. Replaying feeds the
+# same readings to the game clock and the same events to the loop, so every frame runs the same clock steps
+# and the session plays out the same, as fast as the machine allows.
+
+RECORDING_VERSION = 2 # 2: word shuffles from a keyed permutation
+RANDOM_SUBSYSTEMS = ['game', 'words', 'fireworks', 'explosion']
+RECORDED_EVENTS = { # event type: attributes kept
+    pygame.KEYDOWN: ('key', 'mod', 'scancode', 'unicode'),
+    pygame.MOUSEBUTTONDOWN: ('button', 'pos'),
+    pygame.QUIT: (),
+}
+
+
+def new_seeds():
+    return {name: random.getrandbits(64) for name in RANDOM_SUBSYSTEMS}
+
+
+class SessionLog:
+    # Words dealt, guesses made and particle positions, compared between a recording and its replays
+    def __init__(self, first_round) -> None:
+        self.last_round = first_round # the placeholder round from before the first game isn't logged
+        self.words: List[str] = []
+        self.guesses: List[str] = []
+        self.last_guessed_mask = 0
+        self.particle_checksum = 0.0 # sum of rocket and particle positions over all frames
+
+    def observe(self, round_state, particle_position_sum):
+        self.particle_checksum += particle_position_sum
+        if round_state is not self.last_round:
+            self.last_round = round_state
+            self.words.append(round_state.answer)
+            self.guesses.append('')
+            self.last_guessed_mask = 0
+        if self.words and round_state.guessed_mask != self.last_guessed_mask:
+            new_letters = round_state.guessed_mask & ~self.last_guessed_mask
+            self.guesses[-1] += ''.join(chr(ord('A') + index) for index in range(26) if new_letters >> index & 1)
+            self.last_guessed_mask = round_state.guessed_mask
+
+
+class InputRecorder:
+    def __init__(self, seeds: Dict[str, int], screen_size, wordlist) -> None:
+        self.seeds = seeds
+        self.screen_size = list(screen_size)
+        self.wordlist = wordlist
+        self.frame_times: List[float] = [] # seconds since the first frame, one per frame
+        self.events: List[list] = [] # [frame, event type name, attributes]
+        self.start_time = None
+
+    def time_source(self): # used as the game clock's time source, every reading is kept
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+        self.frame_times.append(now - self.start_time)
+        return self.frame_times[-1]
+
+    def record_events(self, events):
+        frame = len(self.frame_times) # events are read before the frame's clock reading
+        for event in events:
+            attributes = RECORDED_EVENTS.get(event.type)
+            if attributes is not None:
+                self.events.append([frame, pygame.event.event_name(event.type), {name: getattr(event, name) for name in attributes}])
+
+    def save(self, file_name, summary):
+        recording = {
+            'version': RECORDING_VERSION,
+            'seeds': self.seeds,
+            'screen_size': self.screen_size,
+            'wordlist': self.wordlist,
+            'frame_times': self.frame_times,
+            'events': self.events,
+            'summary': summary,
+        }
+        with open(file_name, "w") as openfile:
+            json.dump(recording, openfile)
+
+
+class InputReplay:
+    def __init__(self, file_name) -> None:
+        with open(file_name, "r") as openfile:
+            recording = json.load(openfile)
+        if recording.get('version') != RECORDING_VERSION:
+            raise ValueError(f"{file_name} is not a version {RECORDING_VERSION} recording")
+        self.seeds: Dict[str, int] = recording['seeds']
+        self.screen_size = tuple(recording['screen_size'])
+        self.wordlist = recording['wordlist']
+        self.frame_times: List[float] = recording['frame_times']
+        self.summary = recording['summary']
+        event_types = {pygame.event.event_name(event_type): event_type for event_type in RECORDED_EVENTS}
+        self.frame_events: Dict[int, List[pygame.event.Event]] = {}
+        for frame, type_name, attributes in recording['events']:
+            if 'pos' in attributes:
+                attributes['pos'] = tuple(attributes['pos'])
+            self.frame_events.setdefault(frame, []).append(pygame.event.Event(event_types[type_name], attributes))
+        self.frame = 0 # frames whose clock reading has been replayed
+
+    def is_finished(self):
+        return self.frame >= len(self.frame_times)
+
+    def next_events(self):
+        return self.frame_events.get(self.frame, [])
+
+    def time_source(self):
+        frame_time = self.frame_times[self.frame]
+        self.frame += 1
+        return frame_time
+
+
+def compare_summaries(recorded, replayed): # names of the values that differ
+    return [name for name in recorded if recorded[name] != replayed.get(name)]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import string
+from typing import Dict, List, Tuple
+
+# Game rules without pygame, so rounds can be simulated without drawing anything
+
+LETTER_BITS = {letter: 1 << index for index, letter in enumerate(string.ascii_uppercase)} # same bit order as word store masks
+HIDDEN_LETTER = '_'
+MAX_HEALTH = 8 # wrong guesses before a round is lost
+
+ROUND_IN_PROGRESS = -1
+ROUND_LOST = 0
+ROUND_WON = 1
+
+GUESS_IGNORED = 0 # already guessed, not a letter, or the round is over
+GUESS_CORRECT = 1
+GUESS_WRONG = 2
+
+EASY_MODE = "easy" # a random letter of the word is given for free
+HARD_MODE = "hard"
+
+
+def is_easy_word(distinct_letters, letters):
+    return distinct_letters <= 6
+
+
+def is_hard_word(distinct_letters, letters): # no short words, and enough different letters to guess
+    return letters >= 6 and distinct_letters >= 5
+
+
+DIFFICULTY_BUCKETS = {EASY_MODE: is_easy_word, HARD_MODE: is_hard_word} # word scheduler buckets per mode
+
+
+class RoundState:
+    # One word being guessed. Guessed letters are a 26-bit mask and every letter of the answer maps to its
+    # positions, so a guess costs a dict lookup and the win check is a single mask test.
+    __slots__ = ('answer', 'letter_positions', 'answer_mask', 'guessed_mask', 'revealed', 'health', 'max_health', 'outcome')
+
+    def __init__(self, answer: str, max_health) -> None:
+        self.answer = answer.upper()
+        self.letter_positions: Dict[str, Tuple[int, ...]] = {}
+        self.answer_mask = 0
+        self.guessed_mask = 0
+        self.revealed: List[str] = [] # answer as shown, hidden letters are HIDDEN_LETTER
+        self.health = max_health
+        self.max_health = max_health
+        self.outcome = ROUND_IN_PROGRESS
+
+        positions: Dict[str, List[int]] = {}
+        for position, character in enumerate(self.answer):
+            if character in LETTER_BITS:
+                positions.setdefault(character, []).append(position)
+                self.answer_mask |= LETTER_BITS[character]
+                self.revealed.append(HIDDEN_LETTER)
+            else: # spaces and hyphens are shown from the start
+                self.revealed.append(character)
+        self.letter_positions = {letter: tuple(letter_positions) for letter, letter_positions in positions.items()}
+
+    def guess(self, letter: str): # returns GUESS_IGNORED, GUESS_CORRECT or GUESS_WRONG
+        letter = letter.upper()
+        letter_bit = LETTER_BITS.get(letter)
+        if letter_bit is None or self.guessed_mask & letter_bit or self.outcome != ROUND_IN_PROGRESS:
+            return GUESS_IGNORED
+        self.guessed_mask |= letter_bit
+
+        positions = self.letter_positions.get(letter)
+        if positions is None:
+            self.health -= 1
+            if self.health <= 0:
+                self.outcome = ROUND_LOST
+            return GUESS_WRONG
+
+        for position in positions:
+            self.revealed[position] = letter
+        if not self.answer_mask & ~self.guessed_mask:
+            self.outcome = ROUND_WON
+        return GUESS_CORRECT
+
+    def is_guessed(self, letter: str):
+        return bool(self.guessed_mask & LETTER_BITS.get(letter.upper(), 0))
+
+    def revealed_text(self):
+        return ''.join(self.revealed)
+
+    def is_over(self):
+        return self.outcome != ROUND_IN_PROGRESS
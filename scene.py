@@ -0,0 +1,69 @@
+from __future__ import annotations
+import pygame
+from typing import Dict
+from hit_test import HitTestGrid
+
+
+class Scene:
+    # The objects of one menu. The draw list is kept in z order as objects are added: grouped by object type
+    # in the order the types were first added, then in the order added. Drawing, updating and hit testing
+    # a menu walk prebuilt lists and tuples, rebuilt only when objects are added or the active set changes.
+    __slots__ = ('name', 'objects_by_type', 'draw_list', 'active_objects', 'active_tuple', 'hit_test_grids')
+
+    def __init__(self, name) -> None:
+        self.name = name
+        self.objects_by_type: Dict[str, list] = {}
+        self.draw_list: list = []
+        self.active_objects: Dict[object, None] = {} # objects with an update pending, in order of scheduling
+        self.active_tuple: tuple = () # snapshot of active_objects to iterate over
+        self.hit_test_grids: Dict[str, HitTestGrid] = {} # per object type, built on first lookup, dropped when objects are added or moved
+
+    def add(self, object):
+        self.objects_by_type.setdefault(object.object_type, []).append(object)
+        self.draw_list = [object for objects in self.objects_by_type.values() for object in objects]
+        self.hit_test_grids = {}
+
+    def get_objects(self, object_type = None): # the scene's own lists, not copies
+        if object_type is None:
+            return self.draw_list
+        return self.objects_by_type.get(object_type)
+
+    def get_hit_test_grid(self, object_type):
+        hit_test_grid = self.hit_test_grids.get(object_type)
+        if hit_test_grid is None:
+            hit_test_grid = HitTestGrid()
+            hit_test_grid.build(self.objects_by_type.get(object_type, ()))
+            self.hit_test_grids[object_type] = hit_test_grid
+        return hit_test_grid
+
+    def draw(self, screen: pygame.Surface):
+        for object in self.draw_list:
+            visible_when = object.visible_when
+            if visible_when is None or visible_when():
+                object.draw(screen)
+
+    def schedule(self, object):
+        if object not in self.active_objects:
+            self.active_objects[object] = None
+            self.active_tuple = tuple(self.active_objects)
+
+    def update(self): # only objects that scheduled an update run, they drop out once they have nothing left to do
+        finished = False
+        for object in self.active_tuple:
+            object.update()
+            if object.next_deadline() is None:
+                self.active_objects.pop(object, None)
+                finished = True
+        if finished:
+            self.active_tuple = tuple(self.active_objects)
+
+    def next_deadline(self, now): # earliest deadline of the active objects, now if one is due
+        earliest = None
+        for object in self.active_tuple:
+            deadline = object.next_deadline()
+            if deadline is not None:
+                if deadline <= now:
+                    return now
+                if earliest is None or deadline < earliest:
+                    earliest = deadline
+        return earliest
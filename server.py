@@ -0,0 +1,186 @@
+from __future__ import annotations
+import sys
+import json
+import random
+import asyncio
+import argparse
+from typing import Dict
+
+from rules import RoundState, DIFFICULTY_BUCKETS, EASY_MODE, HARD_MODE, MAX_HEALTH, ROUND_WON, ROUND_LOST, GUESS_IGNORED, GUESS_CORRECT, GUESS_WRONG
+from wordstore import open_wordlist
+from word_scheduler import WordScheduler
+
+# Hosts many independent TagMan sessions in one asyncio process, one session per connection.
+#   python server.py --port 8765 --wordlist wordlist.txt
+#   python server.py --unix /tmp/tagman.sock
+#
+# Protocol: one JSON object per line each way.
+#   {"cmd": "new", "mode": "easy"}   starts a word, easy mode gives a random letter of it for free
+#   {"cmd": "guess", "letter": "e"}
+#   {"cmd": "state"}
+#   {"cmd": "stats"}                 server wide counters
+# Every reply has "ok". Game replies carry the round: pattern ('_' for hidden letters), guessed letters,
+# health, outcome (-1 in progress, 0 lost, 1 won), streak, and the answer once the round is over.
+# Guess replies add "result": "correct", "wrong" or "ignored".
+
+MAX_REQUEST_LENGTH = 1024 # bytes per line, longer lines close the connection
+GUESS_RESULTS = {GUESS_IGNORED: 'ignored', GUESS_CORRECT: 'correct', GUESS_WRONG: 'wrong'}
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class GameSession:
+    # What the game keeps in globals for its single player: the round, the mode and the win streak
+    __slots__ = ('session_id', 'mode', 'round', 'streak')
+
+    def __init__(self, session_id) -> None:
+        self.session_id = session_id
+        self.mode = None
+        self.round: RoundState = None
+        self.streak = 0
+
+
+class GameServer:
+    # Rules state per session, words from one shared scheduler. Requests are handled synchronously
+    # between awaits, a guess is a RoundState.guess and a JSON encode.
+    def __init__(self, words, seed = None) -> None:
+        self.word_scheduler = WordScheduler(words, DIFFICULTY_BUCKETS) # no state file, every server run starts a new shuffle
+        self.random = random.Random(seed)
+        self.sessions: Dict[int, GameSession] = {}
+        self.next_session_id = 1
+        self.stats = {'connections': 0, 'games': 0, 'guesses': 0, 'wins': 0, 'losses': 0}
+
+    def open_session(self):
+        session = GameSession(self.next_session_id)
+        self.next_session_id += 1
+        self.sessions[session.session_id] = session
+        self.stats['connections'] += 1
+        return session
+
+    def close_session(self, session: GameSession):
+        self.sessions.pop(session.session_id, None)
+
+    def new_round(self, session: GameSession, mode):
+        if not isinstance(mode, str) or mode not in DIFFICULTY_BUCKETS:
+            raise ProtocolError(f"mode has to be {EASY_MODE} or {HARD_MODE}")
+        if mode != session.mode or (session.round is not None and not session.round.is_over()):
+            session.streak = 0 # like going back to the start menu
+        session.mode = mode
+        session.round = RoundState(self.word_scheduler.next_word(mode), MAX_HEALTH)
+        self.stats['games'] += 1
+        if mode == EASY_MODE:
+            session.round.guess(self.random.choice(session.round.answer))
+
+    def guess(self, session: GameSession, letter):
+        if session.round is None:
+            raise ProtocolError("no round, send new first")
+        if not isinstance(letter, str) or len(letter) != 1:
+            raise ProtocolError("letter has to be a single character")
+        was_over = session.round.is_over()
+        result = session.round.guess(letter)
+        if result != GUESS_IGNORED:
+            self.stats['guesses'] += 1
+        if not was_over and session.round.outcome == ROUND_WON:
+            session.streak += 1
+            self.stats['wins'] += 1
+        elif not was_over and session.round.outcome == ROUND_LOST:
+            session.streak = 0
+            self.stats['losses'] += 1
+        return result
+
+    def session_state(self, session: GameSession):
+        round_state = session.round
+        if round_state is None:
+            return {'ok': True, 'session': session.session_id, 'streak': session.streak}
+        state = {
+            'ok': True,
+            'session': session.session_id,
+            'mode': session.mode,
+            'pattern': round_state.revealed_text(),
+            'guessed': guessed_letters(round_state),
+            'health': round_state.health,
+            'max_health': round_state.max_health,
+            'outcome': round_state.outcome,
+            'streak': session.streak,
+        }
+        if round_state.is_over():
+            state['answer'] = round_state.answer
+        return state
+
+    def handle_request(self, session: GameSession, line: bytes):
+        # One request line in, one reply dict out
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("request has to be a JSON object")
+            command = request.get('cmd')
+            if not isinstance(command, str):
+                raise ProtocolError("cmd has to be a string")
+            if command == 'guess':
+                result = self.guess(session, request.get('letter'))
+                reply = self.session_state(session)
+                reply['result'] = GUESS_RESULTS[result]
+                return reply
+            if command == 'new':
+                self.new_round(session, request.get('mode', HARD_MODE))
+                return self.session_state(session)
+            if command == 'state':
+                return self.session_state(session)
+            if command == 'stats':
+                return {'ok': True, 'sessions': len(self.sessions), **self.stats}
+            raise ProtocolError(f"unknown cmd {command!r}")
+        except ProtocolError as error:
+            return {'ok': False, 'error': str(error)}
+        except ValueError:
+            return {'ok': False, 'error': "request is not valid JSON"}
+        except Exception: # a request the checks above missed answers with an error, it never ends the session
+            return {'ok': False, 'error': "bad request"}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = self.open_session()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write(json.dumps(self.handle_request(session, line), separators=(',', ':')).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError): # ValueError is a line over MAX_REQUEST_LENGTH
+            pass
+        finally:
+            self.close_session(session)
+            writer.close()
+
+    async def serve(self, host = '127.0.0.1', port = 8765, unix_path = None, backlog = 1024, ready: asyncio.Future = None):
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle_client, unix_path, limit=MAX_REQUEST_LENGTH, backlog=backlog)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_REQUEST_LENGTH, backlog=backlog)
+        if ready is not None: # address for callers that start a server in their own loop, port 0 picks a free port
+            ready.set_result(unix_path if unix_path is not None else server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+
+
+def guessed_letters(round_state: RoundState):
+    return ''.join(chr(ord('A') + index) for index in range(26) if round_state.guessed_mask >> index & 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host TagMan sessions over TCP or a unix socket")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="listen on this unix socket instead of TCP")
+    parser.add_argument('--wordlist', default="wordlist.txt", help="text wordlist, or a word store compiled with wordstore.py")
+    args = parser.parse_args()
+
+    game_server = GameServer(open_wordlist(args.wordlist))
+    print(f"Serving TagMan on {args.unix or f'{args.host}:{args.port}'}", file=sys.stderr)
+    try:
+        asyncio.run(game_server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import os
+import sys
+import csv
+import random
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from rules import RoundState, EASY_MODE, HARD_MODE, MAX_HEALTH, ROUND_IN_PROGRESS, ROUND_WON
+from wordstore import WordStore, WORD_STORE_EXTENSION, word_key
+
+# Plays every word of a wordlist many times with a guessing strategy, spread over a process pool.
+# Per word results are written as chunks finish, so memory stays bounded for any wordlist size.
+#   python simulate.py wordlist.txt --games 200 --strategy weighted --mode hard --output stats.csv
+
+ENGLISH_FREQUENCY_ORDER = "ETAOINSHRDLCUMWFGYPBVKJXQZ"
+ENGLISH_LETTER_WEIGHTS = {letter: 26 - index for index, letter in enumerate(ENGLISH_FREQUENCY_ORDER)}
+
+
+def frequency_order(rng: random.Random): # always the most common letters first
+    return ENGLISH_FREQUENCY_ORDER
+
+
+def random_order(rng: random.Random):
+    return rng.sample(ENGLISH_FREQUENCY_ORDER, 26)
+
+
+def weighted_order(rng: random.Random): # random, common letters tend to come first (weighted sampling without replacement)
+    return sorted(ENGLISH_FREQUENCY_ORDER, key=lambda letter: rng.random() ** (1 / ENGLISH_LETTER_WEIGHTS[letter]), reverse=True)
+
+
+STRATEGIES = {
+    'frequency': frequency_order,
+    'random': random_order,
+    'weighted': weighted_order,
+}
+
+RESULT_COLUMNS = ['word', 'letters', 'distinct_letters', 'games', 'wins', 'win_rate', 'mean_wrong_guesses']
+
+
+def play_game(word, guess_order, mode, rng: random.Random, max_health = MAX_HEALTH):
+    # returns (won, wrong guesses)
+    round_state = RoundState(word, max_health)
+    if mode == EASY_MODE:
+        round_state.guess(rng.choice(round_state.answer)) # ignored when it picks a space or hyphen, as in the game
+    for letter in guess_order:
+        round_state.guess(letter)
+        if round_state.outcome != ROUND_IN_PROGRESS:
+            break
+    return round_state.outcome == ROUND_WON, max_health - round_state.health
+
+
+worker_words = None # word store opened once per worker process
+
+
+def open_worker_words(wordlist_file):
+    global worker_words
+    if wordlist_file is not None:
+        worker_words = WordStore(wordlist_file)
+
+
+def simulate_chunk(task):
+    # task is (first word index, words or word count, games, strategy name, mode, seed)
+    first_index, words, games, strategy_name, mode, seed = task
+    if isinstance(words, int): # a range of the worker's word store
+        words = [worker_words[index] for index in range(first_index, first_index + words)]
+    strategy = STRATEGIES[strategy_name]
+    rng = random.Random(f"{seed}/{first_index}") # same results for any number of workers
+    results = []
+    for word in words:
+        wins = 0
+        wrong_guesses = 0
+        for _ in range(games):
+            won, wrong = play_game(word, strategy(rng), mode, rng)
+            wins += won
+            wrong_guesses += wrong
+        results.append((word, wins, wrong_guesses))
+    return results
+
+
+def make_tasks(wordlist_file, chunk_size, games, strategy_name, mode, seed):
+    # Word stores are split into index ranges that workers read from their own mapping,
+    # text wordlists are streamed in chunks of words
+    if wordlist_file.endswith(WORD_STORE_EXTENSION):
+        store = WordStore(wordlist_file)
+        try:
+            word_count = len(store)
+        finally:
+            store.close()
+        for first_index in range(0, word_count, chunk_size):
+            yield (first_index, min(chunk_size, word_count - first_index), games, strategy_name, mode, seed)
+        return
+    first_index = 0
+    chunk: List[str] = []
+    with open(wordlist_file, "r") as openfile:
+        for line in openfile:
+            word = line.rstrip()
+            if not word:
+                continue
+            chunk.append(word)
+            if len(chunk) == chunk_size:
+                yield (first_index, chunk, games, strategy_name, mode, seed)
+                first_index += len(chunk)
+                chunk = []
+    if chunk:
+        yield (first_index, chunk, games, strategy_name, mode, seed)
+
+
+def run_simulation(wordlist_file, writer, games = 100, strategy_name = 'weighted', mode = HARD_MODE, workers = None, chunk_size = 500, seed = 0):
+    # Keeps at most two chunks per worker in flight and writes chunks in submission order as the oldest one
+    # finishes, so the output is the same for any number of workers.
+    # Returns per (distinct letters, letters) group totals, which is what the difficulty buckets are built from.
+    workers = workers or os.cpu_count() or 1
+    store_file = wordlist_file if wordlist_file.endswith(WORD_STORE_EXTENSION) else None
+    groups: Dict[tuple, List[int]] = {} # (distinct letters, letters): [words, games, wins, wrong guesses]
+    tasks = make_tasks(wordlist_file, chunk_size, games, strategy_name, mode, seed)
+    with ProcessPoolExecutor(workers, initializer=open_worker_words, initargs=(store_file,)) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(simulate_chunk, task))
+            if len(pending) >= workers * 2:
+                write_results([pending.popleft()], writer, games, groups)
+        write_results(pending, writer, games, groups)
+    return groups
+
+
+def write_results(futures, writer, games, groups): # futures in word order, each result is waited for
+    for future in futures:
+        for word, wins, wrong_guesses in future.result():
+            distinct_letters, letters = word_key(word)
+            writer.writerow([word, letters, distinct_letters, games, wins, round(wins / games, 4), round(wrong_guesses / games, 3)])
+            group = groups.setdefault((distinct_letters, letters), [0, 0, 0, 0])
+            group[0] += 1
+            group[1] += games
+            group[2] += wins
+            group[3] += wrong_guesses
+
+
+def print_group_summary(groups, output = sys.stderr):
+    print(f"{'distinct':>8} {'letters':>7} {'words':>9} {'win rate':>9} {'wrong':>6}", file=output)
+    for (distinct_letters, letters), (words, games, wins, wrong_guesses) in sorted(groups.items()):
+        print(f"{distinct_letters:>8} {letters:>7} {words:>9} {wins / games:>9.3f} {wrong_guesses / games:>6.2f}", file=output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate TagMan games for every word of a wordlist")
+    parser.add_argument('wordlist', help="text wordlist or compiled .words store")
+    parser.add_argument('--games', type=int, default=100, help="games per word")
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='weighted', help="order the simulated player guesses letters in")
+    parser.add_argument('--mode', choices=[EASY_MODE, HARD_MODE], default=HARD_MODE)
+    parser.add_argument('--workers', type=int, help="processes, default is one per core")
+    parser.add_argument('--chunk-size', type=int, default=500, help="words per task")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="csv file for per word results instead of stdout")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    output = open(args.output, "w", newline='') if args.output else sys.stdout
+    try:
+        writer = csv.writer(output)
+        writer.writerow(RESULT_COLUMNS)
+        groups = run_simulation(args.wordlist, writer, args.games, args.strategy, args.mode, args.workers, args.chunk_size, args.seed)
+    finally:
+        if args.output:
+            output.close()
+    games = sum(group[1] for group in groups.values())
+    print_group_summary(groups)
+    print(f"{games} games in {time.perf_counter() - start:.1f} s", file=sys.stderr)
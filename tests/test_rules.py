@@ -0,0 +1,53 @@
+from rules import RoundState, GUESS_CORRECT, GUESS_WRONG, GUESS_IGNORED, ROUND_IN_PROGRESS, ROUND_LOST, ROUND_WON, HIDDEN_LETTER
+
+
+def test_new_round_hides_only_letters():
+    round_state = RoundState("ice-cream bar", 8)
+    assert round_state.answer == "ICE-CREAM BAR"
+    assert round_state.revealed_text() == "___-_____ ___"
+    assert round_state.outcome == ROUND_IN_PROGRESS
+
+
+def test_correct_guess_reveals_every_position():
+    round_state = RoundState("BANANA", 8)
+    assert round_state.guess("a") == GUESS_CORRECT
+    assert round_state.revealed_text() == "_A_A_A"
+    assert round_state.health == 8
+    assert round_state.is_guessed("A")
+
+
+def test_wrong_guess_costs_health():
+    round_state = RoundState("BANANA", 8)
+    assert round_state.guess("Z") == GUESS_WRONG
+    assert round_state.health == 7
+    assert round_state.revealed_text() == HIDDEN_LETTER * 6
+
+
+def test_repeated_and_invalid_guesses_are_ignored():
+    round_state = RoundState("BANANA", 8)
+    round_state.guess("Z")
+    assert round_state.guess("Z") == GUESS_IGNORED
+    assert round_state.guess("z") == GUESS_IGNORED
+    assert round_state.guess("1") == GUESS_IGNORED
+    assert round_state.guess("-") == GUESS_IGNORED
+    assert round_state.health == 7
+
+
+def test_round_is_won_when_every_letter_is_guessed():
+    round_state = RoundState("ICE-CREAM", 8)
+    for letter in "ICERAM":
+        assert not round_state.is_over()
+        round_state.guess(letter)
+    assert round_state.outcome == ROUND_WON
+    assert round_state.revealed_text() == "ICE-CREAM"
+    assert round_state.guess("Z") == GUESS_IGNORED
+
+
+def test_round_is_lost_when_health_runs_out():
+    round_state = RoundState("BANANA", 3)
+    for letter in "XYZ":
+        round_state.guess(letter)
+    assert round_state.health == 0
+    assert round_state.outcome == ROUND_LOST
+    assert round_state.guess("B") == GUESS_IGNORED
+    assert round_state.revealed_text() == HIDDEN_LETTER * 6
@@ -0,0 +1,84 @@
+import json
+import asyncio
+import pytest
+from rules import ROUND_IN_PROGRESS, MAX_HEALTH
+from wordstore import WordList
+from server import GameServer
+
+WORDS = ["cat", "dog", "tree", "house", "garden", "kitchen", "elephant", "keyboard", "mountain", "ice cream"]
+
+
+def request(game_server, session, line):
+    return game_server.handle_request(session, line.encode() if isinstance(line, str) else line)
+
+
+@pytest.mark.parametrize("line", [
+    'not json',
+    b'\xff\xfe',
+    '[]',
+    '"new"',
+    '42',
+    'null',
+    '{}',
+    '{"cmd": 1}',
+    '{"cmd": ["new"]}',
+    '{"cmd": "dance"}',
+    '{"cmd": "new", "mode": ["x"]}',
+    '{"cmd": "new", "mode": {"easy": 1}}',
+    '{"cmd": "new", "mode": null}',
+    '{"cmd": "new", "mode": "medium"}',
+    '{"cmd": "guess", "letter": "e"}', # no round yet
+])
+def test_malformed_requests_get_an_error_reply(line):
+    game_server = GameServer(WordList(WORDS), seed=1)
+    session = game_server.open_session()
+    reply = request(game_server, session, line)
+    assert reply['ok'] is False
+    assert isinstance(reply['error'], str)
+    assert request(game_server, session, '{"cmd": "new", "mode": "hard"}')['ok'] is True # the session still works
+
+
+@pytest.mark.parametrize("letter", ['null', '5', '""', '"ab"', '["e"]', '{"e": 1}'])
+def test_malformed_guesses_get_an_error_reply(letter):
+    game_server = GameServer(WordList(WORDS), seed=1)
+    session = game_server.open_session()
+    request(game_server, session, '{"cmd": "new", "mode": "hard"}')
+    reply = request(game_server, session, '{"cmd": "guess", "letter": %s}' % letter)
+    assert reply['ok'] is False
+    assert session.round.health == MAX_HEALTH
+
+
+def test_round_over_the_protocol():
+    game_server = GameServer(WordList(WORDS), seed=1)
+    session = game_server.open_session()
+    reply = request(game_server, session, '{"cmd": "new", "mode": "hard"}')
+    assert reply['outcome'] == ROUND_IN_PROGRESS
+    assert 'answer' not in reply
+    answer = session.round.answer
+    for letter in sorted(set(answer.replace(' ', ''))):
+        reply = request(game_server, session, json.dumps({'cmd': 'guess', 'letter': letter.lower()}))
+        assert reply['result'] == 'correct'
+    assert reply['pattern'] == answer
+    assert reply['answer'] == answer
+    assert reply['streak'] == 1
+    assert request(game_server, session, '{"cmd": "stats"}')['wins'] == 1
+
+
+def test_connection_survives_malformed_lines():
+    async def run():
+        game_server = GameServer(WordList(WORDS), seed=1)
+        ready = asyncio.get_running_loop().create_future()
+        server_task = asyncio.create_task(game_server.serve('127.0.0.1', 0, ready=ready))
+        host, port = await ready
+        reader, writer = await asyncio.open_connection(host, port)
+        replies = []
+        for line in [b'{"cmd":"new","mode":["x"]}', b'{"cmd":1}', b'nope', b'[1]', b'{"cmd":"new","mode":"easy"}']:
+            writer.write(line + b'\n')
+            await writer.drain()
+            replies.append(json.loads(await reader.readline()))
+        writer.close()
+        server_task.cancel()
+        return replies
+
+    replies = asyncio.run(run())
+    assert [reply['ok'] for reply in replies] == [False, False, False, False, True]
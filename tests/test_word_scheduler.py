@@ -0,0 +1,80 @@
+import pytest
+from rules import DIFFICULTY_BUCKETS
+from wordstore import WordList
+from word_scheduler import WordBucket, WordScheduler, ALL_WORDS
+
+WORDS = ["cat", "dog", "tree", "house", "garden", "kitchen", "elephant", "keyboard", "mountain", "ice cream",
+         "zebra", "apple", "banana", "window", "pyramid", "question", "sunflower", "jukebox", "oxygen", "lizard"]
+
+
+def bucket_indexes(ranges):
+    return sorted(index for start, count in ranges for index in range(start, start + count))
+
+
+@pytest.mark.parametrize("ranges", [[(0, 1)], [(0, 2)], [(0, 17)], [(3, 5), (20, 7), (90, 1)], [(0, 1000)]])
+def test_bucket_deals_a_full_permutation(ranges):
+    bucket = WordBucket(ranges)
+    bucket.start_cycle(1234, 0)
+    for cycle in range(3): # every shuffle, not only the first, covers the bucket once
+        drawn = [bucket.draw() for _ in range(bucket.size)]
+        assert sorted(drawn) == bucket_indexes(ranges)
+        assert bucket.cycle == cycle
+
+
+def test_bucket_shuffles_differ_per_seed_and_cycle():
+    first = WordBucket([(0, 200)])
+    first.start_cycle(1, 0)
+    first_order = [first.draw() for _ in range(200)]
+    second_cycle_order = [first.draw() for _ in range(200)]
+    other = WordBucket([(0, 200)])
+    other.start_cycle(2, 0)
+    other_order = [other.draw() for _ in range(200)]
+    assert first_order != second_cycle_order
+    assert first_order != other_order
+
+
+@pytest.mark.parametrize("cursor", [0, 1, 37, 99, 100])
+def test_bucket_resumes_from_saved_state(cursor):
+    bucket = WordBucket([(0, 60), (100, 40)])
+    bucket.start_cycle(99, 0)
+    for _ in range(cursor):
+        bucket.draw()
+    state = bucket.get_state()
+    expected = [bucket.draw() for _ in range(150)] # runs into the next shuffle
+
+    restored = WordBucket([(0, 60), (100, 40)])
+    restored.start_cycle(state['seed'], state['cycle'])
+    restored.skip_to(state['cursor'])
+    assert [restored.draw() for _ in range(150)] == expected
+
+
+def test_scheduler_continues_from_state_file(tmp_path):
+    words = WordList(WORDS)
+    state_file = str(tmp_path / "word_schedule.json")
+    uninterrupted = WordScheduler(words, DIFFICULTY_BUCKETS, seed=5)
+    expected = [uninterrupted.next_word(name) for name in [ALL_WORDS, "easy", "hard"] * 15]
+
+    scheduler = WordScheduler(words, DIFFICULTY_BUCKETS, state_file, seed=5)
+    drawn = [scheduler.next_word(name) for name in [ALL_WORDS, "easy", "hard"] * 7]
+    restarted = WordScheduler(words, DIFFICULTY_BUCKETS, state_file, seed=None) # seeds come from the file
+    drawn += [restarted.next_word(name) for name in [ALL_WORDS, "easy", "hard"] * 8]
+    assert drawn == expected
+
+
+def test_scheduler_buckets_follow_difficulty():
+    words = WordList(WORDS)
+    scheduler = WordScheduler(words, DIFFICULTY_BUCKETS, seed=1)
+    for bucket_name, accepts in DIFFICULTY_BUCKETS.items():
+        size = scheduler.buckets[bucket_name].size
+        drawn = [scheduler.next_word(bucket_name) for _ in range(size)]
+        assert len(set(drawn)) == size
+        assert all(accepts(len(set(word.replace(' ', ''))), len(word.replace(' ', ''))) for word in drawn)
+
+
+def test_scheduler_ignores_state_of_another_wordlist(tmp_path):
+    state_file = str(tmp_path / "word_schedule.json")
+    scheduler = WordScheduler(WordList(WORDS), DIFFICULTY_BUCKETS, state_file, seed=3)
+    for _ in range(5):
+        scheduler.next_word()
+    other = WordScheduler(WordList(WORDS[:10]), DIFFICULTY_BUCKETS, state_file, seed=3)
+    assert other.buckets[ALL_WORDS].cursor == 0
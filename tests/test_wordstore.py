@@ -0,0 +1,59 @@
+import pytest
+from wordstore import WordList, WordStore, compile_wordlist, normalize_word, open_wordlist, letter_mask, word_key
+
+
+@pytest.mark.parametrize("line, word", [
+    ("Apple\n", "apple"),
+    ("Café", "cafe"),
+    ("naïve résumé", "naive resume"),
+    ("  New   York\n", "new york"),
+    ("ice-cream", "ice-cream"),
+    ("o'clock", "o'clock"),
+])
+def test_normalize_word_keeps_playable_words(line, word):
+    assert normalize_word(line) == word
+
+
+@pytest.mark.parametrize("line", ["", "   \n", "123", "r2d2", "---", "' -", "Straße", "日本"])
+def test_normalize_word_rejects_unplayable_lines(line):
+    assert normalize_word(line) is None
+
+
+def test_compile_wordlist_counts_and_reads_back(tmp_path):
+    source_file = tmp_path / "words.txt"
+    source_file.write_text("Café\ncafe\nCAFE\n\nice-cream\nice  cream\nice cream\nr2d2\n---\nzebra\n", encoding="utf-8")
+    store_file = str(tmp_path / "words.words")
+    stats = compile_wordlist(str(source_file), store_file)
+    assert stats == {'lines': 10, 'words': 4, 'duplicates': 3, 'rejected': 2}
+
+    store = WordStore(store_file)
+    try:
+        words = list(store)
+        assert sorted(words) == ["cafe", "ice cream", "ice-cream", "zebra"]
+        assert store[-1] == words[-1]
+        with pytest.raises(IndexError):
+            store[len(store)]
+        expected = WordList(words) # same grouping and masks as a text wordlist
+        assert words == expected.words
+        assert store.groups == [tuple(group) for group in expected.groups]
+        for index, word in enumerate(words):
+            assert store.mask(index) == letter_mask(word)
+        assert word_key("ice-cream") == word_key("ice cream") == (6, 8) # spaces and hyphens are not letters
+    finally:
+        store.close()
+
+
+def test_compile_wordlist_without_playable_words(tmp_path):
+    source_file = tmp_path / "words.txt"
+    source_file.write_text("123\n\n---\n", encoding="utf-8")
+    store_file = tmp_path / "words.words"
+    with pytest.raises(ValueError):
+        compile_wordlist(str(source_file), str(store_file))
+    assert not store_file.exists()
+
+
+def test_open_wordlist_rejects_other_files(tmp_path):
+    store_file = tmp_path / "words.words"
+    store_file.write_bytes(b"not a word store at all")
+    with pytest.raises(ValueError):
+        open_wordlist(str(store_file))
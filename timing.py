@@ -0,0 +1,85 @@
+from __future__ import annotations
+import time
+
+STEP_RATE = 120 # simulation steps per second
+MAX_FRAME_TIME = 250 # milliseconds of real time caught up per frame, longer stalls (window drags, breakpoints) pause the game instead
+
+
+class GameClock:
+    # Simulation time in milliseconds, advanced only in fixed steps. Each frame the real time since the
+    # previous frame is turned into whole steps, so a slow frame runs several updates before the next draw
+    # and game speed doesn't depend on the frame rate. Drawing happens between the last two steps:
+    # render_time() and alpha say how far, for interpolating positions and time based animations.
+    def __init__(self, step_rate = STEP_RATE, max_frame_time = MAX_FRAME_TIME, time_source = time.perf_counter) -> None:
+        self.step_time = 1000 / step_rate
+        self.max_frame_time = max_frame_time
+        self.time_source = time_source # seconds
+        self.time = 0.0 # end of the last step
+        self.accumulator = 0.0 # real time not yet simulated
+        self.alpha = 1.0
+        self.last_real_time = None
+        self.steps = 0
+        self.frames = 0
+        self.dropped_time = 0.0 # real time not simulated because a frame took longer than max_frame_time
+
+    def now(self):
+        return self.time
+
+    def render_time(self):
+        return self.time - self.step_time * (1 - self.alpha)
+
+    def advance(self): # number of steps due since the previous frame
+        real_time = self.time_source() * 1000
+        if self.last_real_time is None:
+            self.last_real_time = real_time
+        elapsed_time = real_time - self.last_real_time
+        self.last_real_time = real_time
+        if elapsed_time > self.max_frame_time:
+            self.dropped_time += elapsed_time - self.max_frame_time
+            elapsed_time = self.max_frame_time
+        self.accumulator += elapsed_time
+        steps = int(self.accumulator // self.step_time)
+        self.accumulator -= steps * self.step_time
+        self.alpha = self.accumulator / self.step_time
+        self.frames += 1
+        return steps
+
+    def step(self):
+        self.time += self.step_time
+        self.steps += 1
+
+    def skip_idle(self):
+        # After sleeping with nothing to update, the real time slept becomes game time without running the
+        # steps, except the last one so the update that was waited for still runs on the next frame
+        real_time = self.time_source() * 1000
+        if self.last_real_time is None:
+            self.last_real_time = real_time
+        self.accumulator += real_time - self.last_real_time
+        self.last_real_time = real_time
+        skipped_steps = max(int(self.accumulator // self.step_time) - 1, 0)
+        self.time += skipped_steps * self.step_time
+        self.accumulator -= skipped_steps * self.step_time
+
+
+class Tween:
+    # Progress from 0 to 1 over duration milliseconds of game time, for animations that have to take
+    # the same time at any frame rate. Pass render_time() when drawing, updates use now().
+    def __init__(self, duration) -> None:
+        self.duration = duration
+        self.start_time = 0.0
+
+    def start(self):
+        self.start_time = game_clock.now()
+
+    def progress(self, time = None):
+        if time is None:
+            time = game_clock.now()
+        if self.duration <= 0:
+            return 1.0
+        return min(max((time - self.start_time) / self.duration, 0.0), 1.0)
+
+    def is_finished(self, time = None):
+        return self.progress(time) >= 1.0
+
+
+game_clock = GameClock() # shared by the game and its effects
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import os
+import json
+import random
+import hashlib
+from bisect import bisect_right
+from typing import Callable, Dict, List
+
+ALL_WORDS = 'all'
+SCHEDULE_VERSION = 2 # saved cursors of another shuffle order are thrown away
+FEISTEL_ROUNDS = 4
+
+
+class WordBucket:
+    # Draws the words of some index ranges without repeats. The shuffled order is a keyed permutation of the
+    # bucket positions: a small Feistel network over the next power of four at or above the bucket size, cycle
+    # walking until the result falls inside the bucket (under 4 walks on average). Draw n is the permutation
+    # of n, so nothing is stored per draw and a saved cursor is restored without replaying draws.
+    # A new shuffle, with new round keys, starts when every word has been drawn.
+    def __init__(self, ranges) -> None:
+        self.range_starts: List[int] = [] # position of the first word of every range in the bucket
+        self.word_starts: List[int] = [] # index of that word in the wordlist
+        self.size = 0
+        for start, count in ranges:
+            self.range_starts.append(self.size)
+            self.word_starts.append(start)
+            self.size += count
+        self.half_bits = 0
+        while 1 << (self.half_bits * 2) < self.size:
+            self.half_bits += 1
+        self.half_mask = (1 << self.half_bits) - 1
+        self.seed = 0
+        self.cycle = 0
+        self.cursor = 0
+        self.round_keys: List[int] = []
+
+    def start_cycle(self, seed, cycle):
+        self.seed = seed
+        self.cycle = cycle
+        self.cursor = 0
+        cycle_random = random.Random(f"{seed}/{cycle}")
+        self.round_keys = [cycle_random.getrandbits(64) for _ in range(FEISTEL_ROUNDS)]
+
+    def skip_to(self, cursor): # the cursor is all the state a shuffle has
+        self.cursor = min(max(cursor, 0), self.size)
+
+    def shuffled_position(self, position):
+        half_bits = self.half_bits
+        half_mask = self.half_mask
+        while True:
+            left = position >> half_bits
+            right = position & half_mask
+            for round_key in self.round_keys:
+                left, right = right, left ^ (mix64(right ^ round_key) & half_mask)
+            position = (left << half_bits) | right
+            if position < self.size:
+                return position
+
+    def draw(self): # index of the next word in the wordlist
+        if self.cursor >= self.size:
+            self.start_cycle(self.seed, self.cycle + 1)
+        drawn = self.shuffled_position(self.cursor)
+        self.cursor += 1
+        range_index = bisect_right(self.range_starts, drawn) - 1
+        return self.word_starts[range_index] + drawn - self.range_starts[range_index]
+
+    def get_state(self):
+        return {'seed': self.seed, 'cycle': self.cycle, 'cursor': self.cursor}
+
+
+def mix64(value): # splitmix64 finalizer, the Feistel round function
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 31)
+
+
+class WordScheduler:
+    # Hands out words per difficulty without repeats until a bucket runs out. Buckets are built from
+    # the (distinct letters, letters) groups of a WordList or WordStore, so no word is looked at.
+    # Seeds and cursors are saved after every draw, a restart continues the same shuffles.
+    # Without a state file, seed makes the shuffles repeatable.
+    def __init__(self, words, buckets: Dict[str, Callable[[int, int], bool]], state_file = None, seed = None) -> None:
+        self.words = words
+        self.state_file = state_file
+        self.random = random.Random(seed) # seeds of new shuffles
+        self.buckets: Dict[str, WordBucket] = {ALL_WORDS: WordBucket([(0, len(words))])}
+        for name, accepts in buckets.items():
+            ranges = [(start, count) for distinct_letters, letters, start, count in words.groups if accepts(distinct_letters, letters)]
+            self.buckets[name] = WordBucket(ranges) if ranges else self.buckets[ALL_WORDS] # nothing fits, use every word
+        self.fingerprint = hashlib.sha1(json.dumps([SCHEDULE_VERSION, len(words), [list(group) for group in words.groups]]).encode()).hexdigest()
+        self.load_state()
+
+    def next_word(self, bucket_name = ALL_WORDS) -> str:
+        bucket = self.buckets.get(bucket_name, self.buckets[ALL_WORDS])
+        word = self.words[bucket.draw()]
+        self.save_state()
+        return word
+
+    def load_state(self):
+        state = {}
+        if self.state_file is not None:
+            try:
+                with open(self.state_file, "r") as openfile:
+                    state = json.load(openfile)
+            except (OSError, ValueError):
+                state = {}
+        if state.get('fingerprint') != self.fingerprint: # another wordlist, start over
+            state = {}
+        bucket_states = state.get('buckets', {})
+        for name, bucket in self.buckets.items():
+            bucket_state = bucket_states.get(name)
+            if bucket_state is None:
+                bucket.start_cycle(self.random.getrandbits(64), 0)
+            else:
+                bucket.start_cycle(bucket_state['seed'], bucket_state['cycle'])
+                bucket.skip_to(bucket_state['cursor'])
+
+    def save_state(self):
+        if self.state_file is None:
+            return
+        state = {'fingerprint': self.fingerprint, 'buckets': {name: bucket.get_state() for name, bucket in self.buckets.items()}}
+        temporary_file = self.state_file + ".tmp"
+        try:
+            with open(temporary_file, "w") as openfile:
+                json.dump(state, openfile)
+            os.replace(temporary_file, self.state_file)
+        except OSError: # read-only install or browser build, the order just isn't kept
+            pass
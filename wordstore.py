@@ -0,0 +1,212 @@
+from __future__ import annotations
+import os
+import sys
+import mmap
+import array
+import string
+import struct
+import tempfile
+import unicodedata
+from typing import Dict
+
+STORE_MAGIC = b'TAGMANWS'
+STORE_VERSION = 2
+STORE_HEADER = struct.Struct('<8sIII') # magic, version, word count, group count
+GROUP = struct.Struct('<HHII') # distinct letters, letters, first word, word count
+OFFSET = struct.Struct('<II') # start of a word and start of the next one, in the blob
+MASK = struct.Struct('<I')
+WORD_STORE_EXTENSION = '.words'
+
+PLAYABLE_LETTERS = string.ascii_lowercase # letters with a button
+SHOWN_CHARACTERS = " -'" # shown in the answer as they are, never guessed
+LETTER_BITS = {letter: 1 << index for index, letter in enumerate(PLAYABLE_LETTERS)}
+REMOVE_SHOWN = str.maketrans('', '', SHOWN_CHARACTERS)
+REMOVE_PLAYABLE = str.maketrans('', '', PLAYABLE_LETTERS + SHOWN_CHARACTERS)
+
+# File layout: header, groups, (word count + 1) little-endian uint32 offsets, a uint32 letter mask per word,
+# then all words back to back as ascii. Word i is blob[offsets[i]:offsets[i + 1]].
+# Words are sorted into groups by (distinct letters, letters), so a group is a range of word indexes.
+
+
+def letter_mask(word: str): # bit 0 is 'a'
+    mask = 0
+    for character in set(word.lower()):
+        mask |= LETTER_BITS.get(character, 0)
+    return mask
+
+
+def word_key(word: str): # (distinct letters, letters), the group of the word
+    lower_word = word.lower()
+    return bin(letter_mask(lower_word)).count('1'), sum(1 for character in lower_word if character in LETTER_BITS)
+
+
+class WordList:
+    # Text wordlist arranged like a WordStore: words sorted into groups, with a letter mask per word
+    def __init__(self, words) -> None:
+        grouped_words: Dict[tuple, list] = {}
+        for word in words:
+            grouped_words.setdefault(word_key(word), []).append(word)
+        self.words = []
+        self.groups = []
+        for key in sorted(grouped_words):
+            self.groups.append((*key, len(self.words), len(grouped_words[key])))
+            self.words.extend(grouped_words[key])
+        self.masks = array.array('I', (letter_mask(word) for word in self.words))
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, index) -> str:
+        return self.words[index]
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def mask(self, index):
+        return self.masks[index]
+
+
+class WordStore:
+    # Read-only view of a compiled word store through mmap. Works as a sequence of words,
+    # random.choice(store) picks a word without reading the rest of the file.
+    def __init__(self, file_name) -> None:
+        self.file_name = file_name
+        with open(file_name, "rb") as openfile:
+            self.map = mmap.mmap(openfile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self.word_count, group_count = STORE_HEADER.unpack_from(self.map)
+        except struct.error:
+            self.map.close()
+            raise ValueError(f"{file_name} is not a word store")
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            self.map.close()
+            raise ValueError(f"{file_name} is not a version {STORE_VERSION} word store")
+        self.groups = [GROUP.unpack_from(self.map, STORE_HEADER.size + GROUP.size * group) for group in range(group_count)]
+        self.offsets_start = STORE_HEADER.size + GROUP.size * group_count
+        self.masks_start = self.offsets_start + 4 * (self.word_count + 1)
+        self.blob_start = self.masks_start + 4 * self.word_count
+
+    def __len__(self):
+        return self.word_count
+
+    def __getitem__(self, index) -> str:
+        if index < 0:
+            index += self.word_count
+        if not 0 <= index < self.word_count:
+            raise IndexError("word store index out of range")
+        start, end = OFFSET.unpack_from(self.map, self.offsets_start + 4 * index)
+        return self.map[self.blob_start + start:self.blob_start + end].decode('ascii')
+
+    def __iter__(self):
+        for index in range(self.word_count):
+            yield self[index]
+
+    def mask(self, index):
+        return MASK.unpack_from(self.map, self.masks_start + 4 * index)[0]
+
+    def close(self):
+        self.map.close()
+
+
+def read_wordlist(file_name):
+    wordlist = []
+    with open(file_name, "r") as openfile:
+        for line in openfile:
+            word = line.rstrip()
+            wordlist.append(word)
+
+    return wordlist
+
+
+def open_wordlist(file_name): # compiled word stores are memory mapped instead of read into a list
+    if file_name.endswith(WORD_STORE_EXTENSION):
+        return WordStore(file_name)
+    return WordList(read_wordlist(file_name))
+
+
+def normalize_word(line: str):
+    # Lowercase, accents stripped and runs of whitespace collapsed. None if the word is not playable.
+    if not line.isascii():
+        line = unicodedata.normalize('NFKD', line)
+        line = ''.join(character for character in line if not unicodedata.combining(character))
+    word = ' '.join(line.lower().split())
+    if not word or word.translate(REMOVE_PLAYABLE): # empty, or characters the game can't show
+        return None
+    if not word.translate(REMOVE_SHOWN): # nothing to guess
+        return None
+    return word
+
+
+def compile_wordlist(source_file, store_file) -> Dict[str, int]:
+    # Streams the source one line at a time, words go straight to a temporary blob file.
+    # Only offsets, masks, group members and the set used for deduplication are kept in memory.
+    stats = {'lines': 0, 'words': 0, 'duplicates': 0, 'rejected': 0}
+    offsets = array.array('I', [0])
+    masks = array.array('I')
+    group_members: Dict[tuple, array.array] = {}
+    seen = set()
+    store_folder = os.path.dirname(os.path.abspath(store_file))
+    with tempfile.TemporaryFile(dir=store_folder) as blob:
+        with open(source_file, "r", encoding="utf-8", errors="replace") as openfile:
+            for line in openfile:
+                stats['lines'] += 1
+                if not line.strip():
+                    continue
+                word = normalize_word(line)
+                if word is None:
+                    stats['rejected'] += 1
+                    continue
+                word_bytes = word.encode('ascii')
+                if word_bytes in seen:
+                    stats['duplicates'] += 1
+                    continue
+                seen.add(word_bytes)
+                if offsets[-1] + len(word_bytes) > 0xFFFFFFFF:
+                    raise ValueError(f"{source_file} has more than 4 GB of words")
+                mask = letter_mask(word)
+                letters = len(word) - sum(word.count(character) for character in SHOWN_CHARACTERS)
+                group_members.setdefault((bin(mask).count('1'), letters), array.array('I')).append(len(masks))
+                masks.append(mask)
+                blob.write(word_bytes)
+                offsets.append(offsets[-1] + len(word_bytes))
+        stats['words'] = len(masks)
+        if stats['words'] == 0:
+            raise ValueError(f"{source_file} has no playable words")
+        seen.clear()
+        blob.flush()
+
+        # Same words in group order
+        groups = []
+        sorted_offsets = array.array('I', [0])
+        sorted_masks = array.array('I')
+        for key in sorted(group_members):
+            groups.append(GROUP.pack(*key, len(sorted_masks), len(group_members[key])))
+            for word in group_members[key]:
+                sorted_offsets.append(sorted_offsets[-1] + offsets[word + 1] - offsets[word])
+                sorted_masks.append(masks[word])
+        if sys.byteorder != 'little':
+            sorted_offsets.byteswap()
+            sorted_masks.byteswap()
+
+        temporary_store = store_file + ".tmp"
+        with mmap.mmap(blob.fileno(), 0, access=mmap.ACCESS_READ) as blob_map, open(temporary_store, "wb") as openfile:
+            openfile.write(STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, stats['words'], len(groups)))
+            openfile.writelines(groups)
+            sorted_offsets.tofile(openfile)
+            sorted_masks.tofile(openfile)
+            for key in sorted(group_members):
+                for word in group_members[key]:
+                    openfile.write(blob_map[offsets[word]:offsets[word + 1]])
+        os.replace(temporary_store, store_file)
+    return stats
+
+
+if __name__ == "__main__":
+    # python wordstore.py compile wordlist.txt [wordlist.words]
+    if len(sys.argv) < 3 or sys.argv[1] != 'compile':
+        print("usage: python wordstore.py compile SOURCE [STORE]")
+        sys.exit(1)
+    source_file = sys.argv[2]
+    store_file = sys.argv[3] if len(sys.argv) > 3 else os.path.splitext(source_file)[0] + WORD_STORE_EXTENSION
+    stats = compile_wordlist(source_file, store_file)
+    print(f"Wrote {stats['words']} words to {store_file} ({stats['duplicates']} duplicates and {stats['rejected']} unplayable lines skipped)")